@@ -1,132 +1,393 @@
-import re
-import json
-import yaml
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
+import io
 import os
+import shutil
 import sys
-import zipfile
-from cryptography.fernet import Fernet
-
-from PyQt5.QtWidgets import (
-    QApplication,
-    QWidget,
-    QDesktopWidget,
-    QPushButton,
-    QLabel,
-    QLineEdit,
-    QFileDialog,
-    QVBoxLayout,
-    QHBoxLayout,
-    QTextEdit,
-    QMessageBox,
-    QDialog,
-    QRadioButton
-)
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import nullcontext
+
+from expression_engine import default_engine
+from html_stream import rewrite_html_buffer, tokenize
+from progress import open_input
+from result_writers import write_json_array, write_xml, write_yaml_sequence
+from text_stream import DEFAULT_CHUNK_SIZE, EXPRESSION_PATTERN, rewrite_buffer, rewrite_mapped, rewrite_stream
+
+
+INPUT_FORMATS = {
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.xml': 'xml',
+    '.html': 'html',
+    '.txt': 'text',
+}
+
+FORMAT_EXTENSIONS = {
+    'json': '.json',
+    'yaml': '.yaml',
+    'xml': '.xml',
+    'html': '.html',
+    'text': '.txt',
+    'protobuf': '.pb',
+    'npy': '.npy',
+}
+
+# Двоичные форматы вывода: вместо документа пишутся записи (левый операнд, операция, правый операнд, результат)
+BINARY_FORMATS = ('protobuf', 'npy')
+
+
+# Заменяет metrics.stage, когда метрики не собираются
+NO_METRICS = nullcontext()
+
+
+# Права новых выходных файлов; umask можно только прочитать, заменив его, поэтому это делается один раз при импорте
+UMASK = os.umask(0o022)
+os.umask(UMASK)
+
+# Форматы, которые обрабатываются потоком фрагментов, если формат на выходе тот же
+STREAMING_FORMATS = ('text', 'html', 'json')
+
+
+def detect_input_format(file_name):
+    for extension, input_format in INPUT_FORMATS.items():
+        if file_name.endswith(extension):
+            return input_format
+    return None
+
+
+# Загрузчик и выгрузчик на C из libyaml, если PyYAML собран с ней
+def load_yaml():
+    import yaml
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader), getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+# Пакетное вычисление через numpy подключается только по требованию
+def load_bulk_eval():
+    try:
+        import bulk_eval
+    except ImportError as e:
+        raise ValueError(f"Для пакетного режима требуется numpy: {e}")
+    return bulk_eval
 
 
 class ArithmeticProcessor:
-    def __init__(self, input_file, output_file, input_format, output_format):
+    def __init__(self, input_file, output_file, input_format, output_format, bulk=False, cache=None,
+                 progress=None, metrics=None):
         self.input_file = input_file
         self.output_file = output_file
         self.input_format = input_format
         self.output_format = output_format
+        self.bulk = bulk
+        self.cache = cache
+        # Вызывается с числом прочитанных байт входного файла; может прервать обработку, выбросив Cancelled
+        self.progress = progress
+        # Объект metrics.Metrics; без него обработка не тратит время на измерения
+        self.metrics = metrics
 
     def read_from_file(self):
-        with open(self.input_file, 'rb') as file:
-            if self.input_format == 'json':
-                return json.load(file)
-            elif self.input_format == 'yaml':
-                return yaml.safe_load(file)
-            elif self.input_format in ('text', 'html'):
-                return file.read().decode('utf-8')
-            elif self.input_format == 'xml':
-                return self.read_xml(file)
-
-    def read_xml(self, file):
+        # XML читается лениво, файл закрывает сам read_xml
+        if self.input_format == 'xml':
+            return self.read(self.open_input())
+        with self.open_input() as file:
+            return self.read(file)
+
+    def read(self, file):
+        if self.input_format == 'xml':
+            return self.read_xml(file)
+        elif self.input_format == 'json':
+            import json
+            return json.load(file)
+        elif self.input_format == 'yaml':
+            yaml, loader, _ = load_yaml()
+            return yaml.load(file, Loader=loader)
+        elif self.input_format in ('text', 'html'):
+            return file.read().decode('utf-8')
+
+    def open_input(self):
+        return open_input(self.input_file, self.progress)
+
+    # Выражения отдаются по мере закрытия тегов <expression>, обработанные элементы сразу удаляются из дерева
+    @staticmethod
+    def read_xml(source):
+        import xml.etree.ElementTree as ET
+        parents = []
         try:
-            content = file.read()
-            return self.xml_to_text(ET.fromstring(content.decode('utf-8')))
+            with source:
+                for event, element in ET.iterparse(source, events=('start', 'end')):
+                    if event == 'start':
+                        parents.append(element)
+                        continue
+                    parents.pop()
+                    if element.tag == 'expression':
+                        yield element.text or ''
+                    if parents:
+                        del parents[-1][-1]
         except ET.ParseError as e:
             raise ValueError(f"Ошибка парсинга XML: {e}")
 
-    def xml_to_text(self, element):
-        text = [element.text or ""]
-        for child in element:
-            text.append(self.xml_to_text(child))
-        return " ".join(text)
-
-    def write_to_file(self, content):
-        with open(self.output_file, 'wb') as file:
-            if self.output_format == 'json':
-                json.dump(content, file)
-            elif self.output_format == 'yaml':
-                yaml.dump(content, file)
-            elif self.output_format in ('text', 'html'):
-                file.write(content.encode('utf-8'))
-            elif self.output_format == 'xml':
-                self.write_xml(content, file)
+    def write_to_file(self, content, output_file=None):
+        with open(output_file or self.output_file, 'wb') as file:
+            self.write(content, file)
 
-    @staticmethod
-    def write_xml(content, file):
-        root = ET.Element("calculations")
+    def write(self, content, file):
+        if self.output_format in BINARY_FORMATS:
+            from binary_output import BINARY_WRITERS
+            BINARY_WRITERS[self.output_format](content, file)
+            return
+        if self.output_format in ('json', 'yaml'):
+            text_file = io.TextIOWrapper(file, encoding='utf-8')
+            try:
+                self.write_document(content, text_file)
+            finally:
+                # Двоичный файл остаётся открытым для вызывающего
+                text_file.detach()
+            return
 
-        for result in content:
-            calculation_elem = ET.SubElement(root, "calculation")
-            expression_elem = ET.SubElement(calculation_elem, "expression")
-            expression_elem.text = str(result)
+        # В плоские форматы дерево JSON/YAML выводится как последовательность его значений
+        if isinstance(content, (dict, list)):
+            content = self.iter_leaves(content)
+        if self.output_format in ('text', 'html'):
+            if not isinstance(content, str):
+                content = '\n'.join(map(str, content))
+            file.write(content.encode('utf-8'))
+        elif self.output_format == 'xml':
+            self.write_xml(content, file)
+
+    # Дерево и отдельные значения выгружаются целиком; последовательность результатов
+    # (список или генератор из process_content) пишется по одному элементу
+    def write_document(self, content, file):
+        sequence = isinstance(content, (list, Iterator))
+        if self.output_format == 'json':
+            if sequence:
+                write_json_array(content, file)
+            else:
+                import json
+                json.dump(content, file, ensure_ascii=False, indent=2)
+        else:
+            yaml, _, dumper = load_yaml()
+            if sequence:
+                write_yaml_sequence(content, file, yaml, dumper)
+            else:
+                yaml.dump(content, file, Dumper=dumper, allow_unicode=True, sort_keys=False)
 
-        tree = ET.ElementTree(root)
-        tree.write(file, encoding='utf-8', xml_declaration=True)
+    # Обрабатывает содержимое в памяти и возвращает результат; input_file и output_file не используются
+    def process_data(self, data):
+        content = self.read(io.BytesIO(data))
+        target = io.BytesIO()
+        self.write(self.process_content(content), target)
+        return target.getvalue()
+
+    @staticmethod
+    def write_xml(content, file):
+        write_xml(content, file)
 
     def process_content(self, content):
+        if self.output_format in BINARY_FORMATS:
+            return self.process_records(content)
         if self.input_format in ('json', 'yaml'):
-            if self.input_format == 'json':
-                content = json.dumps(content)
-            elif self.input_format == 'yaml':
-                content = yaml.dump(content)
+            return self.process_tree(content)
         elif self.input_format == 'html':
-            soup = BeautifulSoup(content, 'html.parser')
-            for elem in soup.find_all(string=True):
-                if elem.strip():
-                    elem.replace_with(self.process_text(elem))
-            return str(soup)
+            return rewrite_html_buffer(content, self.evaluate_expression, final=True)[0]
         elif self.input_format == 'xml':
-            try:
-                root = ET.fromstring(content)
-                results = []
-                for calculation in root.findall('calculation'):
-                    expression = calculation.find('expression').text
-                    result = self.evaluate_expression(expression.strip())
-                    results.append(result)
-                return results
-            except ET.ParseError as e:
-                raise ValueError(f"Ошибка при обработке XML: {e}")
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            if isinstance(content, bytes):
+                content = self.read_xml(io.BytesIO(content))
+            # Результаты вычисляются по мере записи, весь список в памяти не собирается
+            return (self.evaluate_expression(expression.strip()) for expression in content)
         return self.process_text(content)
 
+    # Записи для двоичных форматов отдаются лениво, по мере вычисления, и сразу пишутся в файл
+    def process_records(self, content):
+        from binary_output import parse_expression
+        for expression in self.iter_expressions(content):
+            left, operator, right = parse_expression(expression)
+            yield left, operator, right, self.evaluate_expression(expression)
+
+    # Выражения ищутся там же, где их заменяют текстовые форматы: в строковых значениях JSON/YAML,
+    # в тексте HTML вне разметки, в каждом элементе <expression> XML и во всём текстовом файле
+    def iter_expressions(self, content):
+        if self.input_format == 'xml':
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            if isinstance(content, bytes):
+                content = self.read_xml(io.BytesIO(content))
+            for text in content:
+                for match in EXPRESSION_PATTERN.finditer(text):
+                    yield match.group(0)
+            return
+        if self.input_format == 'html':
+            for token in tokenize(content):
+                if token.lastgroup == 'expression':
+                    yield token.group(0)
+            return
+        texts = self.iter_leaves(content) if isinstance(content, (dict, list)) else [content]
+        for text in texts:
+            if isinstance(text, str):
+                for match in EXPRESSION_PATTERN.finditer(text):
+                    yield match.group(0)
+
+    # Выражения вычисляются только в строковых значениях; ключи, числа и структура документа не меняются
+    def process_tree(self, node):
+        if isinstance(node, dict):
+            return {key: self.process_tree(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self.process_tree(value) for value in node]
+        return self.process_text(node)
+
+    @staticmethod
+    def iter_leaves(node):
+        stack = [iter([node])]
+        while stack:
+            for value in stack[-1]:
+                if isinstance(value, dict):
+                    stack.append(iter(value.values()))
+                    break
+                if isinstance(value, list):
+                    stack.append(iter(value))
+                    break
+                yield value
+            else:
+                stack.pop()
+
     def process_text(self, text):
         if not isinstance(text, str):
             return text
-        pattern = r'\d+\s*[\+\-\*\/]\s*\d+'
+        if self.bulk:
+            return load_bulk_eval().rewrite_text(text, self.evaluate_expression)
 
         def replacement(match):
             expression = match.group(0)
             return str(self.evaluate_expression(expression))
 
-        return re.sub(pattern, replacement, text)
+        return EXPRESSION_PATTERN.sub(replacement, text)
 
-    @staticmethod
-    def evaluate_expression(expression):
+    def evaluate_expression(self, expression):
+        if self.metrics is not None:
+            return self.evaluate_measured(expression)
         try:
-            result = eval(expression)
-            return result
+            return default_engine.evaluate(expression)
         except Exception as e:
             raise ValueError(f"Ошибка при вычислении выражения: {expression}. Ошибка: {e}")
 
+    # В пакетном режиме и при повторах в байтовом пути для текста сюда попадает не каждое выражение:
+    # evaluations - число выражений, дошедших до движка
+    def evaluate_measured(self, expression):
+        started = time.perf_counter()
+        try:
+            result = default_engine.evaluate(expression)
+        except Exception as e:
+            self.metrics.add('evaluation_errors')
+            raise ValueError(f"Ошибка при вычислении выражения: {expression}. Ошибка: {e}")
+        self.metrics.add_time('evaluate', time.perf_counter() - started)
+        self.metrics.add('evaluations')
+        return result
+
+    def measure(self, stage):
+        return NO_METRICS if self.metrics is None else self.metrics.stage(stage)
+
+    def run_streaming(self, chunk_size=DEFAULT_CHUNK_SIZE, output_file=None):
+        output_file = output_file or self.output_file
+        if self.input_format not in STREAMING_FORMATS or self.output_format != self.input_format:
+            raise ValueError("Потоковый режим поддерживается только для текстовых, HTML и JSON файлов без смены формата")
+        if self.input_format == 'json':
+            from json_stream import rewrite_json_stream
+            with io.TextIOWrapper(self.open_input(), encoding='utf-8') as source, \
+                    open(output_file, 'w', encoding='utf-8') as target:
+                rewrite_json_stream(source, target, self.process_text, chunk_size)
+            return
+        if self.input_format == 'text' and not self.bulk and self.progress is None:
+            # Текст обрабатывается как байты прямо из отображения файла в память, без декодирования
+            rewrite_mapped(self.input_file, output_file, self.evaluate_expression)
+            return
+        if self.input_format == 'html':
+            rewrite = rewrite_html_buffer
+        elif self.bulk:
+            rewrite = load_bulk_eval().rewrite_buffer
+        else:
+            rewrite = rewrite_buffer
+        with io.TextIOWrapper(self.open_input(), encoding='utf-8', newline='') as source, \
+                open(output_file, 'w', encoding='utf-8', newline='') as target:
+            rewrite_stream(source, target, self.evaluate_expression, chunk_size, rewrite)
+
     def run(self):
-        content = self.read_from_file()
-        processed_content = self.process_content(content)
-        self.write_to_file(processed_content)
+        if self.metrics is None:
+            self.run_cached()
+            return
+
+        metrics = self.metrics
+        hits, misses = default_engine.hits, default_engine.misses
+        try:
+            with metrics.stage('run'):
+                self.run_cached()
+        except Exception:
+            metrics.add('failed_runs')
+            raise
+        finally:
+            metrics.add('runs')
+            metrics.add('engine_cache_hits', default_engine.hits - hits)
+            metrics.add('engine_cache_misses', default_engine.misses - misses)
+            if os.path.exists(self.input_file):
+                metrics.add('bytes_in', os.path.getsize(self.input_file))
+            if os.path.exists(self.output_file):
+                metrics.add('bytes_out', os.path.getsize(self.output_file))
+
+    def run_cached(self):
+        if self.cache is None:
+            self.process()
+            return
+        with self.measure('cache_lookup'):
+            key = self.cache.key_for(self.input_file, self.input_format, self.output_format)
+            hit = self.cache.fetch(key, self.output_file)
+        if self.metrics is not None:
+            self.metrics.add('result_cache_hits' if hit else 'result_cache_misses')
+        if not hit:
+            self.process()
+            with self.measure('cache_store'):
+                self.cache.store(key, self.output_file)
+
+    # XML читается и вычисляется лениво, по мере записи, поэтому его разбор и вычисления учитываются в стадии write.
+    # Результат пишется во временный файл рядом с выходным и заменяет его только после успешной обработки:
+    # так выходной файл может совпадать с входным, а ошибка посередине не оставляет недописанного результата
+    def process(self):
+        directory = os.path.dirname(os.path.abspath(self.output_file))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(self.output_file), suffix='.tmp')
+        os.close(fd)
+        try:
+            if self.input_format in STREAMING_FORMATS and self.output_format == self.input_format:
+                with self.measure('stream'):
+                    self.run_streaming(output_file=temp_path)
+            else:
+                with self.measure('read'):
+                    content = self.read_from_file()
+                with self.measure('process'):
+                    processed_content = self.process_content(content)
+                with self.measure('write'):
+                    self.write_to_file(processed_content, temp_path)
+            self.publish(temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    # Обычно временный файл заменяет выходной. Жёсткую ссылку, сделанную пользователем, замена разорвала бы,
+    # поэтому в неё результат копируется на месте; ссылка на объект кэша (--cache-link) заменяется -
+    # запись через неё испортила бы сохранённый результат. mkstemp создаёт файл с правами 0600,
+    # поэтому выходной получает права прежнего файла или обычные по umask.
+    def publish(self, temp_path):
+        try:
+            stat = os.stat(self.output_file)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o666 & ~UMASK)
+            os.replace(temp_path, self.output_file)
+            return
+        if stat.st_nlink > 1 and not (self.cache is not None and self.cache.link):
+            with open(temp_path, 'rb') as source, open(self.output_file, 'wb') as target:
+                shutil.copyfileobj(source, target, 1 << 20)
+            os.remove(temp_path)
+            return
+        os.chmod(temp_path, stat.st_mode & 0o7777)
+        os.replace(temp_path, self.output_file)
 
 
 class ArithmeticProcessorBuilder:
@@ -135,6 +396,10 @@ class ArithmeticProcessorBuilder:
         self.output_file = None
         self.input_format = None
         self.output_format = None
+        self.bulk = False
+        self.cache = None
+        self.progress = None
+        self.metrics = None
 
     def set_input_file(self, input_file):
         self.input_file = input_file
@@ -152,327 +417,35 @@ class ArithmeticProcessorBuilder:
         self.output_format = output_format
         return self
 
-    def build(self):
-        return ArithmeticProcessor(self.input_file, self.output_file, self.input_format, self.output_format)
-
-
-class ArithmeticProcessorUI(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("UI для сквозной задачи")
-
-        self.action_label = QLabel("Производить ли действия над input-файлом?")
-        self.radio_yes = QRadioButton("Да")
-        self.radio_no = QRadioButton("Нет")
-        self.radio_no.setChecked(True)
-
-        self.input_file_edit = QLineEdit()
-        self.input_file_button = QPushButton("Выбрать файл")
-        self.input_file_button.clicked.connect(self.select_input_file)
-
-        self.output_file_edit = QLineEdit()
-        self.output_file_button = QPushButton("Выбрать файл")
-        self.output_file_button.clicked.connect(self.select_output_file)
-
-        self.input_content_edit = QTextEdit()
-        self.input_content_edit.setReadOnly(True)
-
-        self.output_content_edit = QTextEdit()
-        self.output_content_edit.setReadOnly(True)
-
-        self.process_button = QPushButton("Обработать")
-        self.reverse_process_button = QPushButton("Обратное действие -> Обработать")
-        self.process_button.hide()
-        self.reverse_process_button.hide()
-
-        self.process_button.clicked.connect(self.process_content)
-        self.reverse_process_button.clicked.connect(self.reverse_action)
-        self.exit_button = QPushButton("Выход")
-        self.exit_button.clicked.connect(self.close)
-        self.layout_ui_elements()
-
-        self.center()
-
-    def center(self):
-        screen = QDesktopWidget().screenGeometry()
-        size = self.geometry()
-        x = (screen.width() - size.width()) // 2
-        y = (screen.height() - size.height()) // 2
-        self.move(x, y)
-
-    def layout_ui_elements(self):
-        main_layout = QVBoxLayout()
-        main_layout.addWidget(self.action_label)
-        main_layout.addWidget(self.radio_yes)
-        main_layout.addWidget(self.radio_no)
-
-        input_file_layout = QHBoxLayout()
-        input_file_layout.addWidget(QLabel("Входной файл:"))
-        input_file_layout.addWidget(self.input_file_edit)
-        input_file_layout.addWidget(self.input_file_button)
-        main_layout.addLayout(input_file_layout)
-
-        input_content_layout = QHBoxLayout()
-        input_content_layout.addWidget(QLabel("Содержимое входного файла:"))
-        input_content_layout.addWidget(self.input_content_edit)
-        main_layout.addLayout(input_content_layout)
-
-        output_file_layout = QHBoxLayout()
-        output_file_layout.addWidget(QLabel("Выходной файл:"))
-        output_file_layout.addWidget(self.output_file_edit)
-        output_file_layout.addWidget(self.output_file_button)
-        main_layout.addLayout(output_file_layout)
-
-        output_content_layout = QHBoxLayout()
-        output_content_layout.addWidget(QLabel("Содержимое выходного файла:"))
-        output_content_layout.addWidget(self.output_content_edit)
-        main_layout.addLayout(output_content_layout)
-
-        main_layout.addWidget(self.reverse_process_button)
-        main_layout.addWidget(self.process_button)
-        main_layout.addWidget(self.exit_button)
-
-        self.setLayout(main_layout)
-
-    def select_input_file(self):
-        file_name, _ = QFileDialog.getOpenFileName(self, "Выбрать входной файл", "", "Все файлы (*)")
-        if file_name:
-            self.input_file_edit.setText(file_name)
-            self.load_input_content(file_name)
-            self.update_process_buttons()
-            if self.radio_yes.isChecked():
-                self.show_action_options(file_name)
-
-            self.radio_yes.setEnabled(False)
-            self.radio_no.setEnabled(False)
-
-    def select_output_file(self):
-        file_name, _ = QFileDialog.getSaveFileName(self, "Выбрать выходной файл", "", "Все файлы (*)")
-        if file_name:
-            self.output_file_edit.setText(file_name)
-            self.update_process_buttons()
-
-    def update_process_buttons(self):
-        input_file_selected = bool(self.input_file_edit.text())
-        output_file_selected = bool(self.output_file_edit.text())
-
-        if input_file_selected and output_file_selected:
-            if self.input_file_edit.text().endswith('.encrypted'):
-                self.reverse_process_button.show()
-                self.process_button.hide()
-            elif self.input_file_edit.text().endswith('.zip'):
-                self.reverse_process_button.show()
-                self.process_button.hide()
-            else:
-                self.reverse_process_button.hide()
-                self.process_button.show()
-        else:
-            self.process_button.hide()
-            self.reverse_process_button.hide()
-
-    def show_action_options(self, input_file):
-        self.options_dialog = QDialog(self)
-        self.options_dialog.setWindowTitle("Выбор опций")
-
-        layout = QVBoxLayout()
-        layout.addWidget(QLabel("Выберите опцию:"))
-
-        self.encrypt_radio = QRadioButton("Зашифровать")
-        self.archive_radio = QRadioButton("Архивировать")
-        self.encrypt_then_archive_radio = QRadioButton("Зашифровать, потом Архивировать")
-        self.archive_then_encrypt_radio = QRadioButton("Архивировать, потом Зашифровать")
-
-        layout.addWidget(self.encrypt_radio)
-        layout.addWidget(self.archive_radio)
-        layout.addWidget(self.encrypt_then_archive_radio)
-        layout.addWidget(self.archive_then_encrypt_radio)
-
-        confirm_button = QPushButton("Подтвердить")
-        confirm_button.clicked.connect(lambda: self.handle_action_options(self.options_dialog, input_file))
-        layout.addWidget(confirm_button)
-
-        self.options_dialog.setLayout(layout)
-        self.options_dialog.exec_()
-
-    def handle_action_options(self, dialog, input_file):
-        if not (self.encrypt_radio.isChecked() or self.archive_radio.isChecked() or
-                self.encrypt_then_archive_radio.isChecked() or self.archive_then_encrypt_radio.isChecked()):
-            QMessageBox.warning(self, "Предупреждение", "Пожалуйста, выберите хотя бы одну опцию.")
-            return
-
-        try:
-            if self.encrypt_radio.isChecked():
-                encrypted_file = self.encrypt_file(input_file)
-                self.input_file_edit.setText(encrypted_file)
-                QMessageBox.information(self, "Успех", "Файл успешно зашифрован.")
-            elif self.archive_radio.isChecked():
-                archived_file = self.archive_file(input_file)
-                self.input_file_edit.setText(archived_file)
-                QMessageBox.information(self, "Успех", "Файл успешно архивирован.")
-            elif self.encrypt_then_archive_radio.isChecked():
-                encrypted_file = self.encrypt_file(input_file)
-                archived_file = self.archive_file(encrypted_file)
-                self.input_file_edit.setText(archived_file)
-                QMessageBox.information(self, "Успех", "Файл успешно зашифрован и архивирован.")
-            elif self.archive_then_encrypt_radio.isChecked():
-                archived_file = self.archive_file(input_file)
-                encrypted_file = self.encrypt_file(archived_file)
-                self.input_file_edit.setText(encrypted_file)
-                QMessageBox.information(self, "Успех", "Файл успешно архивирован и зашифрован.")
-
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Произошла ошибка: {e}")
-
-        dialog.accept()
-
-    @staticmethod
-    def encrypt_file(input_file):
-        key = Fernet.generate_key()
-        cipher = Fernet(key)
-
-        key_file_name = input_file + '.key'
-        with open(key_file_name, 'wb') as key_file:
-            key_file.write(key)
-
-        with open(input_file, 'rb') as file:
-            original_data = file.read()
-        encrypted_data = cipher.encrypt(original_data)
-        encrypted_file_name = input_file + '.encrypted'
-        with open(encrypted_file_name, 'wb') as enc_file:
-            enc_file.write(encrypted_data)
-
-        return encrypted_file_name
-
-    @staticmethod
-    def archive_file(input_file):
-        archive_file_name = input_file + '.zip'
-        with zipfile.ZipFile(archive_file_name, 'w') as zipf:
-            zipf.write(input_file, os.path.basename(input_file))
-        return archive_file_name
-
-    def load_input_content(self, file_name):
-        try:
-            with open(file_name, 'rb') as file:
-                content = file.read()
-                self.input_content_edit.setText(content.decode('utf-8', 'ignore'))
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Не удалось открыть файл: {e}")
-
-    def process_content(self):
-        input_file = self.input_file_edit.text()
-        output_file = self.output_file_edit.text()
-
-        if not input_file or not output_file:
-            QMessageBox.warning(self, "Ошибка", "Пожалуйста, выберите входной файл и выходной файл.")
-            return
-
-        if input_file.endswith('.json'):
-            input_format = 'json'
-        elif input_file.endswith('.yaml'):
-            input_format = 'yaml'
-        elif input_file.endswith('.xml'):
-            input_format = 'xml'
-        elif input_file.endswith('.html'):
-            input_format = 'html'
-        elif input_file.endswith('.txt'):
-            input_format = 'text'
-        elif input_file.endswith('.encrypted'):
-            QMessageBox.warning(self, "Ошибка", "Пожалуйста, расшифруйте файл перед обработкой.")
-            return
-        elif input_file.endswith('.zip'):
-            QMessageBox.warning(self, "Ошибка", "Пожалуйста, извлеките файлы из архива перед обработкой.")
-            return
-        else:
-            QMessageBox.warning(self, "Ошибка", "Неверный формат входного файла.")
-            return
-
-        processor = ArithmeticProcessor(input_file, output_file, input_format,
-                                        'text')
-
-        try:
-            processor.run()
-            QMessageBox.information(self, "Успех", "Файл успешно обработан.")
-
-            with open(output_file, 'r', encoding='utf-8') as file:
-                output_content = file.read()
-                self.output_content_edit.setText(output_content)
-
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Произошла ошибка при обработке файла: {e}")
-
-    def reverse_action(self):
-        input_file = self.input_file_edit.text()
-        output_file = self.output_file_edit.text()
-
-        if not input_file:
-            QMessageBox.warning(self, "Ошибка", "Пожалуйста, выберите файл для обратного действия.")
-            return
-
-        try:
-            if input_file.endswith('.encrypted'):
-                decrypted_file = self.decrypt_file(input_file)
-                if decrypted_file:
-                    self.input_file_edit.setText(decrypted_file)
-                    QMessageBox.information(self, "Успех", "Файл успешно расшифрован.")
-
-                    processor = ArithmeticProcessor(decrypted_file, output_file, 'text', 'text')
-                    processor.run()
-                    QMessageBox.information(self, "Успех", "Выражения успешно вычислены и записаны в выходной файл.")
-
-                    with open(output_file, 'r', encoding='utf-8') as file:
-                        output_content = file.read()
-                        self.output_content_edit.setText(output_content)
-
-            elif input_file.endswith('.zip'):
-                temp_dir = os.path.join(os.path.dirname(input_file), 'temp_extracted')
-                os.makedirs(temp_dir, exist_ok=True)
-
-                with zipfile.ZipFile(input_file, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
-
-                for file_info in zip_ref.infolist():
-                    extracted_file = os.path.join(temp_dir, file_info.filename)
-                    if os.path.isfile(extracted_file):
-                        processor = ArithmeticProcessor(extracted_file, output_file, 'text', 'text')
-                        processor.run()
-
-                QMessageBox.information(self, "Успех", "Файлы успешно обработаны.")
-
-                with open(output_file, 'r', encoding='utf-8') as file:
-                    output_content = file.read()
-                    self.output_content_edit.setText(output_content)
-
-            else:
-                QMessageBox.warning(self, "Ошибка", "Файл не является зашифрованным или архивированным.")
-
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Ошибка при выполнении обратного действия: {e}")
+    def set_bulk(self, bulk=True):
+        self.bulk = bulk
+        return self
 
-    def decrypt_file(self, input_file):
-        try:
-            key_file_name = input_file.replace('.encrypted', '.key')
-            with open(key_file_name, 'rb') as key_file:
-                key = key_file.read()
+    def set_cache(self, cache):
+        self.cache = cache
+        return self
 
-            cipher = Fernet(key)
-            with open(input_file, 'rb') as file:
-                encrypted_data = file.read()
+    def set_progress(self, progress):
+        self.progress = progress
+        return self
 
-            decrypted_data = cipher.decrypt(encrypted_data)
+    def set_metrics(self, metrics):
+        self.metrics = metrics
+        return self
 
-            output_file = self.output_file_edit.text() or input_file.replace('.encrypted', '.decrypted')
+    def build(self):
+        return ArithmeticProcessor(self.input_file, self.output_file, self.input_format, self.output_format,
+                                   self.bulk, self.cache, self.progress, self.metrics)
 
-            with open(output_file, 'wb') as dec_file:
-                dec_file.write(decrypted_data)
 
-            return output_file
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Ошибка при расшифровке файла: {e}")
-            return None
+def __getattr__(name):
+    # Интерфейс на PyQt5 загружается только по требованию
+    if name == 'ArithmeticProcessorUI':
+        from arithmetic_processor_ui import ArithmeticProcessorUI
+        return ArithmeticProcessorUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = ArithmeticProcessorUI()
-    window.show()
-    sys.exit(app.exec_())
+    from arithmetic_processor_ui import main
+    sys.exit(main())
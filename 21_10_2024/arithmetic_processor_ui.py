@@ -0,0 +1,398 @@
+import os
+import sys
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QApplication,
+    QWidget,
+    QDesktopWidget,
+    QPushButton,
+    QLabel,
+    QLineEdit,
+    QFileDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QTextEdit,
+    QMessageBox,
+    QDialog,
+    QRadioButton,
+    QProgressBar,
+    QListWidget,
+    QListWidgetItem
+)
+
+import crypto_archive
+from arithmetic_processor import ArithmeticProcessor, detect_input_format
+from ui_jobs import Job, JobQueue
+
+
+# Большие файлы показываются в окне только частично, чтобы не загружать их целиком в QTextEdit
+PREVIEW_SIZE = 1 << 20
+PROGRESS_STEPS = 1000
+
+
+def read_preview(file_name):
+    with open(file_name, 'rb') as file:
+        content = file.read(PREVIEW_SIZE + 1)
+    text = content[:PREVIEW_SIZE].decode('utf-8', 'ignore')
+    if len(content) > PREVIEW_SIZE:
+        text += f"\n... (показан первый 1 МБ из {os.path.getsize(file_name) / 1e6:.1f} МБ)"
+    return text
+
+
+class ArithmeticProcessorUI(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("UI для сквозной задачи")
+
+        self.action_label = QLabel("Производить ли действия над input-файлом?")
+        self.radio_yes = QRadioButton("Да")
+        self.radio_no = QRadioButton("Нет")
+        self.radio_no.setChecked(True)
+
+        self.input_file_edit = QLineEdit()
+        self.input_file_button = QPushButton("Выбрать файл")
+        self.input_file_button.clicked.connect(self.select_input_file)
+
+        self.output_file_edit = QLineEdit()
+        self.output_file_button = QPushButton("Выбрать файл")
+        self.output_file_button.clicked.connect(self.select_output_file)
+
+        self.input_content_edit = QTextEdit()
+        self.input_content_edit.setReadOnly(True)
+
+        self.output_content_edit = QTextEdit()
+        self.output_content_edit.setReadOnly(True)
+
+        self.process_button = QPushButton("Обработать")
+        self.reverse_process_button = QPushButton("Обратное действие -> Обработать")
+        self.process_button.hide()
+        self.reverse_process_button.hide()
+
+        self.process_button.clicked.connect(self.process_content)
+        self.reverse_process_button.clicked.connect(self.reverse_action)
+        self.exit_button = QPushButton("Выход")
+        self.exit_button.clicked.connect(self.close)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, PROGRESS_STEPS)
+        self.status_label = QLabel("Нет активных задач")
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMaximumHeight(80)
+        self.cancel_button = QPushButton("Отменить задачу")
+        self.cancel_button.clicked.connect(self.cancel_job)
+        self.cancel_all_button = QPushButton("Отменить все")
+        self.cancel_all_button.clicked.connect(self.cancel_all_jobs)
+
+        self.job_queue = JobQueue(self)
+        self.job_queue.changed.connect(self.update_jobs_list)
+        self.update_jobs_list()
+        self.layout_ui_elements()
+
+        self.center()
+
+    def center(self):
+        screen = QDesktopWidget().screenGeometry()
+        size = self.geometry()
+        x = (screen.width() - size.width()) // 2
+        y = (screen.height() - size.height()) // 2
+        self.move(x, y)
+
+    def layout_ui_elements(self):
+        main_layout = QVBoxLayout()
+        main_layout.addWidget(self.action_label)
+        main_layout.addWidget(self.radio_yes)
+        main_layout.addWidget(self.radio_no)
+
+        input_file_layout = QHBoxLayout()
+        input_file_layout.addWidget(QLabel("Входной файл:"))
+        input_file_layout.addWidget(self.input_file_edit)
+        input_file_layout.addWidget(self.input_file_button)
+        main_layout.addLayout(input_file_layout)
+
+        input_content_layout = QHBoxLayout()
+        input_content_layout.addWidget(QLabel("Содержимое входного файла:"))
+        input_content_layout.addWidget(self.input_content_edit)
+        main_layout.addLayout(input_content_layout)
+
+        output_file_layout = QHBoxLayout()
+        output_file_layout.addWidget(QLabel("Выходной файл:"))
+        output_file_layout.addWidget(self.output_file_edit)
+        output_file_layout.addWidget(self.output_file_button)
+        main_layout.addLayout(output_file_layout)
+
+        output_content_layout = QHBoxLayout()
+        output_content_layout.addWidget(QLabel("Содержимое выходного файла:"))
+        output_content_layout.addWidget(self.output_content_edit)
+        main_layout.addLayout(output_content_layout)
+
+        main_layout.addWidget(self.reverse_process_button)
+        main_layout.addWidget(self.process_button)
+
+        main_layout.addWidget(QLabel("Задачи:"))
+        main_layout.addWidget(self.jobs_list)
+        main_layout.addWidget(self.status_label)
+        main_layout.addWidget(self.progress_bar)
+        jobs_buttons_layout = QHBoxLayout()
+        jobs_buttons_layout.addWidget(self.cancel_button)
+        jobs_buttons_layout.addWidget(self.cancel_all_button)
+        main_layout.addLayout(jobs_buttons_layout)
+
+        main_layout.addWidget(self.exit_button)
+
+        self.setLayout(main_layout)
+
+    def select_input_file(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Выбрать входной файл", "", "Все файлы (*)")
+        if file_name:
+            self.input_file_edit.setText(file_name)
+            self.load_input_content(file_name)
+            self.update_process_buttons()
+            if self.radio_yes.isChecked():
+                self.show_action_options(file_name)
+
+            self.radio_yes.setEnabled(False)
+            self.radio_no.setEnabled(False)
+
+    def select_output_file(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Выбрать выходной файл", "", "Все файлы (*)")
+        if file_name:
+            self.output_file_edit.setText(file_name)
+            self.update_process_buttons()
+
+    def update_process_buttons(self):
+        input_file_selected = bool(self.input_file_edit.text())
+        output_file_selected = bool(self.output_file_edit.text())
+
+        if input_file_selected and output_file_selected:
+            if self.input_file_edit.text().endswith('.encrypted'):
+                self.reverse_process_button.show()
+                self.process_button.hide()
+            elif self.input_file_edit.text().endswith('.zip'):
+                self.reverse_process_button.show()
+                self.process_button.hide()
+            else:
+                self.reverse_process_button.hide()
+                self.process_button.show()
+        else:
+            self.process_button.hide()
+            self.reverse_process_button.hide()
+
+    def show_action_options(self, input_file):
+        self.options_dialog = QDialog(self)
+        self.options_dialog.setWindowTitle("Выбор опций")
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Выберите опцию:"))
+
+        self.encrypt_radio = QRadioButton("Зашифровать")
+        self.archive_radio = QRadioButton("Архивировать")
+        self.encrypt_then_archive_radio = QRadioButton("Зашифровать, потом Архивировать")
+        self.archive_then_encrypt_radio = QRadioButton("Архивировать, потом Зашифровать")
+
+        layout.addWidget(self.encrypt_radio)
+        layout.addWidget(self.archive_radio)
+        layout.addWidget(self.encrypt_then_archive_radio)
+        layout.addWidget(self.archive_then_encrypt_radio)
+
+        confirm_button = QPushButton("Подтвердить")
+        confirm_button.clicked.connect(lambda: self.handle_action_options(self.options_dialog, input_file))
+        layout.addWidget(confirm_button)
+
+        self.options_dialog.setLayout(layout)
+        self.options_dialog.exec_()
+
+    def handle_action_options(self, dialog, input_file):
+        if self.encrypt_radio.isChecked():
+            steps, title, message = [self.encrypt_file], "Шифрование", "Файл успешно зашифрован."
+        elif self.archive_radio.isChecked():
+            steps, title, message = [self.archive_file], "Архивирование", "Файл успешно архивирован."
+        elif self.encrypt_then_archive_radio.isChecked():
+            steps, title, message = ([self.encrypt_file, self.archive_file], "Шифрование и архивирование",
+                                     "Файл успешно зашифрован и архивирован.")
+        elif self.archive_then_encrypt_radio.isChecked():
+            steps, title, message = ([self.archive_file, self.encrypt_file], "Архивирование и шифрование",
+                                     "Файл успешно архивирован и зашифрован.")
+        else:
+            QMessageBox.warning(self, "Предупреждение", "Пожалуйста, выберите хотя бы одну опцию.")
+            return
+
+        def run_steps(job):
+            path = input_file
+            for step in steps:
+                path = step(path, job)
+            return path
+
+        def finished(path):
+            self.input_file_edit.setText(path)
+            self.update_process_buttons()
+            QMessageBox.information(self, "Успех", message)
+
+        self.submit_job(f"{title}: {os.path.basename(input_file)}", run_steps, finished, "Произошла ошибка")
+        dialog.accept()
+
+    @staticmethod
+    def encrypt_file(input_file, job=None):
+        if job is None:
+            return crypto_archive.encrypt_file(input_file)
+        job.stage("Шифрование", os.path.getsize(input_file))
+        return crypto_archive.encrypt_file(input_file, job.output(input_file + '.encrypted'), progress=job.report)
+
+    @staticmethod
+    def archive_file(input_file, job=None):
+        if job is None:
+            return crypto_archive.archive_file(input_file)
+        job.stage("Архивирование", os.path.getsize(input_file))
+        return crypto_archive.archive_file(input_file, job.output(input_file + '.zip'), progress=job.report)
+
+    def load_input_content(self, file_name):
+        try:
+            self.input_content_edit.setText(read_preview(file_name))
+        except Exception as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось открыть файл: {e}")
+
+    def show_output(self, output_file, message):
+        QMessageBox.information(self, "Успех", message)
+        self.output_content_edit.setText(read_preview(output_file))
+
+    def submit_job(self, title, function, finished, error_message):
+        job = Job(title, function)
+        job.signals.progress.connect(self.show_progress)
+        job.signals.finished.connect(finished)
+        job.signals.failed.connect(lambda error: QMessageBox.warning(self, "Ошибка", f"{error_message}: {error}"))
+        job.signals.cancelled.connect(lambda: self.status_label.setText(f"Отменено: {title}"))
+        self.job_queue.submit(job)
+
+    def show_progress(self, stage, done, total):
+        self.status_label.setText(f"{stage}: {done / 1e6:.1f} из {total / 1e6:.1f} МБ")
+        self.progress_bar.setValue(PROGRESS_STEPS if not total else min(PROGRESS_STEPS, done * PROGRESS_STEPS // total))
+
+    def update_jobs_list(self):
+        self.jobs_list.clear()
+        for job in self.job_queue.jobs:
+            item = QListWidgetItem(("выполняется: " if job.running else "в очереди: ") + job.title)
+            item.setData(Qt.UserRole, job)
+            self.jobs_list.addItem(item)
+        idle = not self.job_queue.jobs
+        self.cancel_button.setEnabled(not idle)
+        self.cancel_all_button.setEnabled(not idle)
+        if idle:
+            self.progress_bar.reset()
+
+    # Отменяет выбранную в списке задачу, а если ничего не выбрано - выполняющуюся
+    def cancel_job(self):
+        item = self.jobs_list.currentItem() or self.jobs_list.item(0)
+        if item is not None:
+            self.job_queue.cancel(item.data(Qt.UserRole))
+
+    def cancel_all_jobs(self):
+        self.job_queue.cancel_all()
+
+    def closeEvent(self, event):
+        self.job_queue.cancel_all()
+        self.job_queue.wait()
+        super().closeEvent(event)
+
+    def process_content(self):
+        input_file = self.input_file_edit.text()
+        output_file = self.output_file_edit.text()
+
+        if not input_file or not output_file:
+            QMessageBox.warning(self, "Ошибка", "Пожалуйста, выберите входной файл и выходной файл.")
+            return
+
+        input_format = detect_input_format(input_file)
+        if input_format is None:
+            if input_file.endswith('.encrypted'):
+                QMessageBox.warning(self, "Ошибка", "Пожалуйста, расшифруйте файл перед обработкой.")
+            elif input_file.endswith('.zip'):
+                QMessageBox.warning(self, "Ошибка", "Пожалуйста, извлеките файлы из архива перед обработкой.")
+            else:
+                QMessageBox.warning(self, "Ошибка", "Неверный формат входного файла.")
+            return
+
+        def process(job):
+            job.stage("Обработка", os.path.getsize(input_file))
+            processor = ArithmeticProcessor(input_file, job.output(output_file), input_format, 'text',
+                                            progress=job.report)
+            processor.run()
+            return output_file
+
+        self.submit_job(f"Обработка: {os.path.basename(input_file)}", process,
+                        lambda path: self.show_output(path, "Файл успешно обработан."),
+                        "Произошла ошибка при обработке файла")
+
+    def reverse_action(self):
+        input_file = self.input_file_edit.text()
+        output_file = self.output_file_edit.text()
+
+        if not input_file:
+            QMessageBox.warning(self, "Ошибка", "Пожалуйста, выберите файл для обратного действия.")
+            return
+
+        if input_file.endswith('.encrypted'):
+            decrypted_file = input_file.replace('.encrypted', '.decrypted')
+
+            def reverse(job):
+                self.decrypt_file(input_file, decrypted_file, job)
+                job.stage("Обработка", os.path.getsize(decrypted_file))
+                processor = ArithmeticProcessor(decrypted_file, job.output(output_file), 'text', 'text',
+                                                progress=job.report)
+                processor.run()
+                return output_file
+
+            def finished(path):
+                self.input_file_edit.setText(decrypted_file)
+                self.show_output(path, "Файл расшифрован, выражения вычислены и записаны в выходной файл.")
+
+        elif input_file.endswith('.zip'):
+            # Если выбран каталог, результат каждого элемента пишется в нём в отдельный файл
+            per_member = os.path.isdir(output_file)
+
+            def reverse(job):
+                import multiprocessing
+                import zip_processor
+                members = zip_processor.archive_members(input_file)
+                job.stage("Обработка архива", sum(info.file_size for info in members))
+                # Процессы-обработчики запускаются через spawn: fork процесса с потоками Qt небезопасен
+                results = zip_processor.process_archive(
+                    input_file,
+                    output_file=None if per_member else job.output(output_file),
+                    output_dir=output_file if per_member else None,
+                    progress=job.report,
+                    mp_context=multiprocessing.get_context('spawn'))
+                return [f"{name}: {error}" for name, _, _, error in results if error is not None]
+
+            def finished(errors):
+                if errors:
+                    QMessageBox.warning(self, "Ошибка", f"Не удалось обработать элементов архива: {len(errors)}\n"
+                                        + "\n".join(errors[:10]))
+                if per_member:
+                    QMessageBox.information(self, "Успех", f"Результаты элементов архива записаны в {output_file}.")
+                else:
+                    self.show_output(output_file, "Файлы успешно обработаны.")
+
+        else:
+            QMessageBox.warning(self, "Ошибка", "Файл не является зашифрованным или архивированным.")
+            return
+
+        self.submit_job(f"Обратное действие: {os.path.basename(input_file)}", reverse, finished,
+                        "Ошибка при выполнении обратного действия")
+
+    @staticmethod
+    def decrypt_file(input_file, output_file, job=None):
+        if job is None:
+            return crypto_archive.decrypt_file(input_file, output_file)
+        job.stage("Расшифровка", os.path.getsize(input_file))
+        return crypto_archive.decrypt_file(input_file, job.output(output_file), progress=job.report)
+
+
+def main():
+    app = QApplication(sys.argv)
+    window = ArithmeticProcessorUI()
+    window.show()
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
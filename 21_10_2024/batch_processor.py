@@ -0,0 +1,176 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from arithmetic_processor import FORMAT_EXTENSIONS, ArithmeticProcessorBuilder, detect_input_format
+from metrics import Metrics
+
+
+# Часть шаблона до первого компонента со спецсимволами glob: относительно неё считаются пути
+# найденных файлов, чтобы одноимённые файлы из разных каталогов (шаблоны с **) не совпадали на выходе
+def glob_root(pattern):
+    if not glob.has_magic(pattern):
+        return os.path.dirname(pattern)
+    parts = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or (os.sep if pattern.startswith(os.sep) else os.curdir)
+
+
+def collect_inputs(patterns):
+    inputs = []
+    seen = set()
+
+    def add(path, base):
+        path = os.path.abspath(path)
+        if path not in seen and detect_input_format(path) is not None:
+            seen.add(path)
+            inputs.append((path, os.path.relpath(path, base)))
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, _, file_names in os.walk(pattern):
+                for file_name in sorted(file_names):
+                    add(os.path.join(directory, file_name), pattern)
+        else:
+            root = glob_root(pattern)
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, root)
+    return inputs
+
+
+def output_path(output_dir, relative_path, output_format):
+    extension = FORMAT_EXTENSIONS[output_format]
+    if not relative_path.endswith(extension):
+        relative_path += extension
+    return os.path.join(output_dir, relative_path)
+
+
+def process_file(task):
+    input_file, output_file, output_format, bulk, cache, collect_metrics = task
+    input_format = detect_input_format(input_file)
+    started = time.perf_counter()
+    bytes_in = bytes_out = 0
+    metrics = Metrics() if collect_metrics else None
+    try:
+        bytes_in = os.path.getsize(input_file)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        processor = (ArithmeticProcessorBuilder()
+                     .set_input_file(input_file)
+                     .set_output_file(output_file)
+                     .set_input_format(input_format)
+                     .set_output_format(output_format)
+                     .set_bulk(bulk)
+                     .set_cache(cache)
+                     .set_metrics(metrics)
+                     .build())
+        processor.run()
+        error = None
+        bytes_out = os.path.getsize(output_file)
+    except Exception as e:
+        error = str(e)
+    snapshot = metrics.snapshot() if metrics is not None else None
+    return input_file, input_format, bytes_in, bytes_out, time.perf_counter() - started, error, snapshot
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m batch_processor",
+        description="Пакетная обработка файлов с арифметическими выражениями без графического интерфейса.")
+    parser.add_argument("inputs", nargs="+", help="входные файлы, шаблоны (glob) или каталоги")
+    parser.add_argument("-o", "--output-dir", required=True, help="каталог для выходных файлов")
+    parser.add_argument("-f", "--output-format", default="text", choices=sorted(FORMAT_EXTENSIONS),
+                        help="формат выходных файлов (по умолчанию text)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="число процессов-обработчиков (по умолчанию число ядер)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="вычислять выражения пакетно через numpy")
+    parser.add_argument("--cache-dir", help="каталог кэша результатов; неизменённые входные файлы не обрабатываются повторно")
+    parser.add_argument("--cache-max-mb", type=int, default=1024,
+                        help="предельный размер кэша в МБ, давно не использованные результаты вытесняются (по умолчанию 1024)")
+    parser.add_argument("--cache-link", action="store_true",
+                        help="создавать жёсткие ссылки на результаты в кэше вместо копирования "
+                             "(выходные файлы тогда нельзя изменять на месте)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="записать метрики по стадиям в FILE: Prometheus для .prom, иначе JSON")
+    parser.add_argument("-q", "--quiet", action="store_true", help="не печатать сводку по каждому файлу")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("Не найдено ни одного входного файла.", file=sys.stderr)
+        return 1
+
+    if args.output_format == 'xml':
+        # write_xml ждёт последовательность результатов, а текст и HTML дают одну строку
+        flat = [path for path, _ in inputs if detect_input_format(path) in ('text', 'html')]
+        if flat:
+            print(f"Формат xml на выходе поддерживается только для входных json, yaml и xml: {flat[0]}",
+                  file=sys.stderr)
+            return 2
+
+    cache = None
+    if args.cache_dir:
+        from result_cache import ResultCache
+        cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, args.cache_link)
+        stats_before = cache.stats()
+
+    tasks = [(path, output_path(args.output_dir, relative_path, args.output_format), args.output_format,
+              args.bulk, cache, args.metrics is not None)
+             for path, relative_path in inputs]
+    # Выходной файл не должен совпадать ни с одним входным, в том числе через символические ссылки:
+    # иначе результат заменил бы исходные выражения или вход другой задачи
+    sources = {os.path.normcase(os.path.realpath(path)) for path, _ in inputs}
+    targets = {}
+    for task in tasks:
+        if os.path.normcase(os.path.realpath(task[1])) in sources:
+            print(f"Выходной файл {task[1]} совпадает с входным, выберите другой выходной каталог", file=sys.stderr)
+            return 2
+        if task[1] in targets:
+            print(f"Файлы {targets[task[1]]} и {task[0]} записываются в один и тот же {task[1]}", file=sys.stderr)
+            return 2
+        targets[task[1]] = task[0]
+    metrics = Metrics()
+    workers = max(1, args.workers)
+    chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+
+    total_in = total_out = 0
+    failed = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for input_file, input_format, bytes_in, bytes_out, seconds, error, snapshot in executor.map(
+                process_file, tasks, chunksize=chunksize):
+            if snapshot is not None:
+                metrics.merge(snapshot)
+            total_in += bytes_in
+            total_out += bytes_out
+            if error is not None:
+                failed += 1
+                print(f"ОШИБКА {input_file}: {error}", file=sys.stderr)
+            elif not args.quiet:
+                print(f"OK     {input_file} [{input_format}] {bytes_in} -> {bytes_out} байт, {seconds * 1000:.1f} мс")
+    elapsed = time.perf_counter() - started
+
+    print(f"Файлов: {len(tasks)}, с ошибками: {failed}, процессов: {workers}")
+    print(f"Прочитано {total_in / 1e6:.2f} МБ, записано {total_out / 1e6:.2f} МБ за {elapsed:.2f} с")
+    print(f"Пропускная способность: {len(tasks) / elapsed:.1f} файлов/с, {total_in / 1e6 / elapsed:.2f} МБ/с")
+    if args.metrics:
+        metrics.dump(args.metrics)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Кэш: попаданий {stats['hits'] - stats_before['hits']}, промахов {stats['misses'] - stats_before['misses']}, "
+              f"вытеснено {stats['evictions'] - stats_before['evictions']}, размер {stats['size'] / 1e6:.2f} МБ")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arithmetic_processor import ArithmeticProcessor
+
+
+OUTPUT_FORMATS = ('xml', 'json', 'protobuf', 'npy')
+
+
+def make_text(count):
+    rng = random.Random(0)
+    return '\n'.join(f"{rng.randint(0, 99999)} {rng.choice('+-*/')} {rng.randint(1, 99999)}" for _ in range(count))
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+# Вычисление и запись замеряются отдельно: содержимое для записи материализуется заранее.
+# Для XML это список результатов, как при входе XML, для JSON - дерево с заменёнными выражениями,
+# для двоичных форматов - список записей.
+def prepare(processor, output_format):
+    content = processor.read_from_file()
+    if output_format == 'xml':
+        return [processor.process_text(line) for line in content.split('\n')]
+    content = processor.process_content(content)
+    return content if isinstance(content, dict) else list(content)
+
+
+def measure(input_file, output_file, output_format):
+    input_format = 'json' if output_format == 'json' else 'text'
+    processor = ArithmeticProcessor(input_file, output_file, input_format, output_format)
+    content, prepare_seconds = timed(prepare, processor, output_format)
+    _, write_seconds = timed(processor.write_to_file, content)
+    return os.path.getsize(output_file), write_seconds, prepare_seconds + write_seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    text = make_text(count)
+    with tempfile.TemporaryDirectory() as directory:
+        text_file = os.path.join(directory, 'input.txt')
+        with open(text_file, 'w', encoding='utf-8') as file:
+            file.write(text)
+        # Для JSON на выходе вход - документ с теми же выражениями, формат JSON не меняется
+        json_file = os.path.join(directory, 'input.json')
+        with open(json_file, 'w', encoding='utf-8') as file:
+            json.dump({"expressions": text.split('\n')}, file)
+
+        print(f"{count} выражений, вход {os.path.getsize(text_file) / 1e6:.1f} МБ")
+        print(f"    {'формат':<10} {'размер':>10} {'байт/запись':>12} {'запись':>10} {'записей/с':>12} {'всего':>10}")
+        for output_format in OUTPUT_FORMATS:
+            input_file = json_file if output_format == 'json' else text_file
+            output_file = os.path.join(directory, f'output.{output_format}')
+            size, write_seconds, total_seconds = measure(input_file, output_file, output_format)
+            print(f"    {output_format:<10} {size / 1e6:8.2f} МБ {size / count:12.1f} {write_seconds * 1000:7.0f} мс "
+                  f"{count / write_seconds:12.0f} {total_seconds * 1000:7.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_crypto
+import crypto_archive
+
+
+def make_files(directory, count, size):
+    rng = random.Random(0)
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f'output_{index}.txt')
+        with open(path, 'wb') as file:
+            file.write(rng.randbytes(rng.randint(size // 2, size * 3 // 2)))
+        paths.append(path)
+    return paths
+
+
+def report(name, files, total, seconds, extra=''):
+    print(f"    {name:<36} {seconds * 1000:9.1f} мс  {files / seconds:9.0f} файлов/с  "
+          f"{total / 1e6 / seconds:8.1f} МБ/с  {extra}")
+
+
+# Прежний путь интерфейса: новый ключ и файл .key на каждый файл, файлы по одному
+def encrypt_with_key_files(pairs):
+    started = time.perf_counter()
+    for input_file, encrypted_file in pairs:
+        crypto_archive.encrypt_file(input_file, encrypted_file)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 16 << 10
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_dir = os.path.join(directory, 'input')
+        os.mkdir(input_dir)
+        inputs = make_files(input_dir, count, size)
+        total = sum(map(os.path.getsize, inputs))
+        print(f"{count} файлов, {total / 1e6:.1f} МБ, ядер: {os.cpu_count()}")
+        master_key = crypto_archive.generate_key()
+
+        # Каждый вариант пишет в пустой каталог, который потом удаляется: время создания файлов
+        # заметно зависит от того, сколько их уже есть
+        def pairs_for(name):
+            output_dir = os.path.join(directory, name)
+            os.mkdir(output_dir)
+            return output_dir, [(path, os.path.join(output_dir, os.path.basename(path) + bulk_crypto.ENCRYPTED_SUFFIX))
+                                for path in inputs]
+
+        output_dir, pairs = pairs_for('key_files')
+        report("ключ на файл, последовательно", count, total, encrypt_with_key_files(pairs), f"файлов ключей: {count}")
+        shutil.rmtree(output_dir)
+
+        for workers in (1, 4, 16):
+            output_dir, pairs = pairs_for(f'master_{workers}')
+            summary = bulk_crypto.encrypt_files(pairs, master_key, workers)
+            report(f"мастер-ключ, потоков: {workers}", count, total, summary['seconds'])
+            if workers == 4:
+                # Эти файлы потом расшифровываются
+                decrypt_pairs = [(encrypted, encrypted[:-len(bulk_crypto.ENCRYPTED_SUFFIX)]) for _, encrypted in pairs]
+            else:
+                shutil.rmtree(output_dir)
+
+        summary = bulk_crypto.decrypt_files(decrypt_pairs, master_key, 4)
+        report("расшифровка, потоков: 4", count, summary['bytes'], summary['seconds'], f"ошибок: {summary['failed']}")
+
+
+if __name__ == "__main__":
+    main()
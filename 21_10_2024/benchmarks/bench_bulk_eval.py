@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arithmetic_processor import ArithmeticProcessor
+from expression_engine import default_engine
+
+
+def make_text(lines, distinct):
+    rng = random.Random(0)
+    pool = [f"{rng.randint(0, 99999)} {rng.choice('+-*/')} {rng.randint(1, 99999)}" for _ in range(distinct)]
+    return '\n'.join(rng.choice(pool) for _ in range(lines)) + '\n'
+
+
+def bench(name, processor, text, expressions, repeat=3):
+    def run():
+        default_engine.clear()
+        return processor.process_text(text)
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    print(f"{name:<20} {best * 1000:9.1f} мс  {expressions / best / 1e6:6.2f} млн выраж./с")
+    return best, run()
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    scalar = ArithmeticProcessor(None, None, 'text', 'text')
+    bulk = ArithmeticProcessor(None, None, 'text', 'text', bulk=True)
+
+    for distinct in (1000, lines):
+        text = make_text(lines, distinct)
+        print(f"{lines} строк, {distinct} различных выражений, {len(text) / 1e6:.1f} МБ:")
+        scalar_time, expected = bench("re.sub + движок", scalar, text, lines)
+        bulk_time, result = bench("numpy", bulk, text, lines)
+        assert result == expected
+        print(f"{'ускорение':<20} {scalar_time / bulk_time:9.1f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
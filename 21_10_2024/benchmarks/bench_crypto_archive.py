@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.fernet import Fernet
+
+import crypto_archive
+
+
+def make_text(path, size):
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as file:
+        written = 0
+        while written < size:
+            line = f"Результат {rng.randint(0, 999)} {rng.choice('+-*/')} {rng.randint(1, 999)} равен ?\n"
+            file.write(line)
+            written += len(line.encode('utf-8'))
+
+
+def report(name, size, seconds, extra=''):
+    print(f"{name:<32} {seconds * 1000:9.1f} мс  {size / 1e6 / seconds:8.1f} МБ/с  {extra}")
+
+
+def fernet_encrypt(input_file, encrypted_file):
+    cipher = Fernet(Fernet.generate_key())
+    with open(input_file, 'rb') as file:
+        data = file.read()
+    with open(encrypted_file, 'wb') as file:
+        file.write(cipher.encrypt(data))
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1e6) if len(sys.argv) > 1 else 64_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'input.txt')
+        make_text(input_file, size)
+        size = os.path.getsize(input_file)
+        encrypted_file = os.path.join(directory, 'input.txt.encrypted')
+        decrypted_file = os.path.join(directory, 'input.txt.decrypted')
+        print(f"Файл {size / 1e6:.1f} МБ")
+
+        started = time.perf_counter()
+        fernet_encrypt(input_file, encrypted_file)
+        report("Fernet (весь файл в памяти)", size, time.perf_counter() - started)
+
+        key = crypto_archive.generate_key()
+        for segment_size in (64 << 10, 1 << 20, 4 << 20):
+            started = time.perf_counter()
+            crypto_archive.encrypt_file(input_file, encrypted_file, key, segment_size)
+            encrypt_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            crypto_archive.decrypt_file(encrypted_file, decrypted_file, key)
+            decrypt_time = time.perf_counter() - started
+
+            report(f"AES-GCM, сегмент {segment_size >> 10} КБ", size, encrypt_time,
+                   f"расшифровка {size / 1e6 / decrypt_time:.1f} МБ/с")
+
+        print()
+        archive = os.path.join(directory, 'input.zip')
+        for method, levels in (('stored', (None,)), ('deflated', (1, 6, 9)), ('bzip2', (1, 9)), ('lzma', (None,))):
+            for level in levels:
+                started = time.perf_counter()
+                crypto_archive.archive_file(input_file, archive, method, level)
+                seconds = time.perf_counter() - started
+                name = method if level is None else f"{method}, уровень {level}"
+                report(name, size, seconds, f"степень сжатия {size / os.path.getsize(archive):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_engine import ExpressionEngine
+
+
+def make_expressions(count, distinct):
+    rng = random.Random(0)
+    pool = [f"{rng.randint(0, 999)} {rng.choice('+-*/')} {rng.randint(1, 999)}" for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def bench(name, make_function, expressions, repeat=5):
+    def run():
+        function = make_function()
+        for expression in expressions:
+            function(expression)
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    print(f"{name:<28} {best * 1000:9.1f} мс  {len(expressions) / best / 1e6:6.2f} млн выраж./с")
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    for distinct in (100, 10_000, count):
+        expressions = make_expressions(count, distinct)
+        print(f"{count} выражений, {distinct} различных:")
+        eval_time = bench("eval", lambda: eval, expressions)
+        bench("ExpressionEngine без кэша", lambda: ExpressionEngine(cache_size=0).evaluate, expressions)
+
+        engines = []
+
+        def make_engine():
+            engines.append(ExpressionEngine())
+            return engines[-1].evaluate
+
+        engine_time = bench("ExpressionEngine с кэшем", make_engine, expressions)
+        engine = engines[-1]
+        print(f"{'ускорение':<28} {eval_time / engine_time:9.1f}x, "
+              f"попаданий в кэш: {engine.hits}, промахов: {engine.misses}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arithmetic_processor import ArithmeticProcessor
+
+
+def make_page(path, size):
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('<!DOCTYPE html>\n<html lang="ru">\n<head>\n<meta charset="UTF-8">\n'
+                   '<style>td { padding: 2px 4px; }</style>\n</head>\n<body>\n')
+        written = 0
+        while written < size:
+            rows = ''.join(
+                f'  <tr class="row-{i % 2}"><td>{rng.randint(0, 999)} {rng.choice("+-*/")} {rng.randint(1, 999)}</td>'
+                f'<td title="{rng.randint(0, 9)}+{rng.randint(0, 9)}">значение &amp; ещё</td></tr>\n'
+                for i in range(50))
+            block = (f'<h2>Раздел</h2>\n<!-- {rng.randint(0, 9)} + 1 -->\n<table>\n{rows}</table>\n'
+                     f'<script>var total = {rng.randint(0, 99)} + {rng.randint(0, 99)};</script>\n')
+            file.write(block)
+            written += len(block.encode('utf-8'))
+        file.write('</body>\n</html>\n')
+
+
+# Прежняя обработка HTML: дерево BeautifulSoup, замена строк по одной и сериализация
+def process_with_soup(input_file, output_file):
+    from bs4 import BeautifulSoup
+    processor = ArithmeticProcessor(input_file, output_file, 'html', 'html')
+    with open(input_file, 'rb') as file:
+        soup = BeautifulSoup(file.read().decode('utf-8'), 'html.parser')
+    for elem in soup.find_all(string=True):
+        if elem.strip():
+            elem.replace_with(processor.process_text(elem))
+    with open(output_file, 'wb') as file:
+        file.write(str(soup).encode('utf-8'))
+
+
+def process_streaming(input_file, output_file):
+    ArithmeticProcessor(input_file, output_file, 'html', 'html').run()
+
+
+def bench(name, function, input_file, output_file):
+    size = os.path.getsize(input_file)
+    started = time.perf_counter()
+    function(input_file, output_file)
+    seconds = time.perf_counter() - started
+    print(f"{name:<20} {seconds * 1000:9.1f} мс  {size / 1e6 / seconds:7.2f} МБ/с  "
+          f"на выходе {os.path.getsize(output_file) / 1e6:.2f} МБ")
+    return seconds
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1e6) if len(sys.argv) > 1 else 20_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'page.html')
+        make_page(input_file, size)
+        print(f"Страница {os.path.getsize(input_file) / 1e6:.1f} МБ")
+
+        soup_time = bench("BeautifulSoup", process_with_soup, input_file, os.path.join(directory, 'soup.html'))
+        stream_time = bench("потоковый режим", process_streaming, input_file, os.path.join(directory, 'stream.html'))
+        print(f"{'ускорение':<20} {soup_time / stream_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
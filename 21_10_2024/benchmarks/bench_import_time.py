@@ -0,0 +1,63 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Модули, которые не должны загружаться при запуске без графического интерфейса
+HEAVY_MODULES = ('PyQt5', 'bs4', 'yaml', 'cryptography', 'xml.etree', 'numpy')
+
+HEADLESS_MODULES = ('arithmetic_processor', 'batch_processor')
+
+
+def measure(module, runs):
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+        imported = {}
+        for line in completed.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                imported[match.group(4)] = int(match.group(2))
+        total = imported[module]
+        if best is None or total < best[0]:
+            best = (total, imported)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени импорта модулей проекта (python -X importtime).")
+    parser.add_argument('modules', nargs='*', default=list(HEADLESS_MODULES) + ['arithmetic_processor_ui'])
+    parser.add_argument('--runs', type=int, default=5, help="число запусков, берётся лучший")
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="допустимое время импорта модулей без интерфейса, мс")
+    parser.add_argument('--top', type=int, default=5, help="сколько самых медленных зависимостей показать")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        total, imported = measure(module, args.runs)
+        heavy = sorted(name for name in imported if name.split('.')[0] in HEAVY_MODULES or
+                       any(name.startswith(prefix) for prefix in HEAVY_MODULES))
+        print(f"{module}: {total / 1000:.1f} мс, модулей загружено: {len(imported)}")
+        for name, cumulative in sorted(imported.items(), key=lambda item: -item[1])[1:args.top + 1]:
+            print(f"    {cumulative / 1000:8.1f} мс  {name}")
+
+        if module in HEADLESS_MODULES:
+            if heavy:
+                failed = True
+                print(f"    РЕГРЕССИЯ: загружены тяжёлые модули: {', '.join(heavy[:10])}")
+            if args.budget_ms is not None and total / 1000 > args.budget_ms:
+                failed = True
+                print(f"    РЕГРЕССИЯ: превышен бюджет {args.budget_ms} мс")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arithmetic_processor import ArithmeticProcessor, load_yaml
+
+
+def make_document(count):
+    rng = random.Random(0)
+    return {
+        "name": "расчёт 2024",
+        "expressions": [f"{rng.randint(0, 999)} {rng.choice('+-*/')} {rng.randint(1, 999)}" for _ in range(count)],
+        "meta": {"version": 3, "ids": list(range(1000))},
+    }
+
+
+# Прежний путь: документ сериализуется обратно в строку, и регулярное выражение проходит по всей строке
+def process_with_dump(input_file, output_file, input_format):
+    processor = ArithmeticProcessor(input_file, output_file, input_format, input_format)
+    content = processor.read_from_file()
+    if input_format == 'json':
+        content = json.dumps(content)
+    else:
+        yaml, _, _ = load_yaml()
+        content = yaml.dump(content)
+    with open(output_file, 'w', encoding='utf-8') as file:
+        file.write(processor.process_text(content))
+
+
+def process_tree(input_file, output_file, input_format):
+    processor = ArithmeticProcessor(input_file, output_file, input_format, input_format)
+    processor.write_to_file(processor.process_content(processor.read_from_file()))
+
+
+def process_streaming(input_file, output_file, input_format):
+    ArithmeticProcessor(input_file, output_file, input_format, input_format).run_streaming()
+
+
+VARIANTS = {
+    'dump + regex': process_with_dump,
+    'обход дерева': process_tree,
+    'потоковый JSON': process_streaming,
+}
+
+
+def run_child(variant, input_file, output_file, input_format):
+    started = time.perf_counter()
+    VARIANTS[variant](input_file, output_file, input_format)
+    seconds = time.perf_counter() - started
+    print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(*sys.argv[2:])
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    document = make_document(count)
+    with tempfile.TemporaryDirectory() as directory:
+        for input_format in ('json', 'yaml'):
+            input_file = os.path.join(directory, f'input.{input_format}')
+            with open(input_file, 'w', encoding='utf-8') as file:
+                if input_format == 'json':
+                    json.dump(document, file, ensure_ascii=False, indent=2)
+                else:
+                    yaml, _, dumper = load_yaml()
+                    yaml.dump(document, file, Dumper=dumper, allow_unicode=True, sort_keys=False)
+            size = os.path.getsize(input_file)
+            print(f"{input_format}: {count} выражений, {size / 1e6:.1f} МБ")
+
+            for variant in VARIANTS:
+                if variant == 'потоковый JSON' and input_format != 'json':
+                    continue
+                output_file = os.path.join(directory, f'output.{input_format}')
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', variant, input_file, output_file, input_format],
+                    capture_output=True, text=True, check=True)
+                seconds, max_rss = completed.stdout.split()
+                seconds = float(seconds)
+                print(f"    {variant:<16} {seconds * 1000:9.1f} мс  {size / 1e6 / seconds:7.2f} МБ/с  "
+                      f"пик памяти {int(max_rss) / 1024:7.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
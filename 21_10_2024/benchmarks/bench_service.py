@@ -0,0 +1,76 @@
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service import UnixHTTPConnection, process_remote
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Так вызывающие сервисы обрабатывали файл раньше: отдельный интерпретатор на каждый файл
+SUBPROCESS_CODE = ("import sys; from arithmetic_processor import ArithmeticProcessor; "
+                   "ArithmeticProcessor(sys.argv[1], sys.argv[2], 'json', 'xml').run()")
+
+
+def make_document(rng, count):
+    items = ', '.join(f'"{rng.randint(0, 999)} {rng.choice("+-*/")} {rng.randint(1, 999)}"' for _ in range(count))
+    return f'{{"expressions": [{items}]}}'.encode('utf-8')
+
+
+def wait_for_socket(path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Сервис не запустился")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    expressions = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = random.Random(0)
+    documents = [make_document(rng, expressions) for _ in range(files)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'input.json')
+        output_file = os.path.join(directory, 'output.xml')
+        started = time.perf_counter()
+        for document in documents:
+            with open(input_file, 'wb') as file:
+                file.write(document)
+            subprocess.run([sys.executable, '-c', SUBPROCESS_CODE, input_file, output_file], cwd=ROOT, check=True)
+        per_process = (time.perf_counter() - started) / files
+
+        unix_path = os.path.join(directory, 'service.sock')
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'service.py'), '--unix', unix_path],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_socket(unix_path)
+            connection = UnixHTTPConnection(unix_path)
+            # Первый запрос запускает процесс-обработчик, он в замер не входит
+            process_remote(documents[0], 'json', 'xml', connection=connection)
+            started = time.perf_counter()
+            for document in documents:
+                process_remote(document, 'json', 'xml', connection=connection)
+            per_request = (time.perf_counter() - started) / files
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{files} файлов по {expressions} выражений (JSON -> XML)")
+    print(f"    процесс на файл    {per_process * 1000:8.1f} мс на файл")
+    print(f"    запрос к сервису   {per_request * 1000:8.1f} мс на файл  ({per_process / per_request:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
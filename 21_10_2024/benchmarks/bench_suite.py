@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from arithmetic_processor import FORMAT_EXTENSIONS, STREAMING_FORMATS, ArithmeticProcessor
+from generators import FORMATS, generate
+
+SIZE_UNITS = {'K': 1e3, 'M': 1e6, 'G': 1e9}
+
+
+def parse_size(text):
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    for unit in ('G', 'M', 'K'):
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:g}{unit}B"
+    return f"{size}B"
+
+
+def current_commit():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                                   capture_output=True, text=True, check=True)
+        return completed.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Стадии повторяют ArithmeticProcessor.run; в потоковом режиме чтение, обработка и запись совмещены.
+# Ленивые стадии (чтение XML, обработка в генератор) выполняются только при записи, поэтому
+# измеряются вместе с ней: 'run' - весь проход, 'process+write' - обработка и запись.
+# В список они не собираются, чтобы пик памяти был таким же, как при обычном запуске.
+def run_stages(input_file, output_file, input_format, output_format, bulk):
+    processor = ArithmeticProcessor(input_file, output_file, input_format, output_format, bulk)
+    stages = {}
+    if input_format in STREAMING_FORMATS and output_format == input_format:
+        started = time.perf_counter()
+        processor.run_streaming()
+        stages['stream'] = time.perf_counter() - started
+        return stages
+
+    started = time.perf_counter()
+    content = processor.read_from_file()
+    if isinstance(content, Iterator):
+        processor.write_to_file(processor.process_content(content))
+        stages['run'] = time.perf_counter() - started
+        return stages
+    stages['read'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    content = processor.process_content(content)
+    if isinstance(content, Iterator):
+        processor.write_to_file(content)
+        stages['process+write'] = time.perf_counter() - started
+        return stages
+    stages['process'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    processor.write_to_file(content)
+    stages['write'] = time.perf_counter() - started
+    return stages
+
+
+def run_child(arguments):
+    input_file, output_file, input_format, output_format, bulk = arguments
+    stages = run_stages(input_file, output_file, input_format, output_format, bulk == '1')
+    # ru_maxrss в Linux - в килобайтах
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({'stages': stages, 'peak_rss': peak_rss}))
+
+
+def measure(input_file, output_file, input_format, output_format, bulk):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child',
+         input_file, output_file, input_format, output_format, '1' if bulk else '0'],
+        capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout)
+
+
+def prepare_input(data_dir, input_format, size, density, distinct, seed):
+    name = f"{input_format}_{format_size(size)}_d{density:g}_u{distinct}_s{seed}{FORMAT_EXTENSIONS[input_format]}"
+    path = os.path.join(data_dir, name)
+    meta_path = path + '.meta.json'
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as file:
+            return path, json.load(file)['expressions']
+
+    expressions = generate(path, input_format, size, density, distinct, seed)
+    with open(meta_path, 'w', encoding='utf-8') as file:
+        json.dump({'expressions': expressions}, file)
+    return path, expressions
+
+
+def print_comparison(results, baseline_file):
+    with open(baseline_file, encoding='utf-8') as file:
+        baseline = json.load(file)
+    previous = {(item['format'], item['output_format'], item['size'], item['density'], item['bulk']): item
+                for item in baseline['results']}
+    print(f"\nСравнение с {baseline_file} (коммит {baseline.get('commit')}):")
+    for item in results:
+        old = previous.get((item['format'], item['output_format'], item['size'], item['density'], item['bulk']))
+        if old is None or 'error' in item or 'error' in old:
+            continue
+        print(f"  {item['format']:<5} {format_size(item['size']):>7}  "
+              f"время {old['seconds'] / item['seconds']:5.2f}x  "
+              f"память {old['peak_rss'] / item['peak_rss']:5.2f}x")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Замер пропускной способности ArithmeticProcessor.run по форматам.")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="форматы через запятую")
+    parser.add_argument('--sizes', default='1M,10M', help="размеры входных файлов через запятую, например 1M,100M,2G")
+    parser.add_argument('--density', type=float, default=1.0, help="доля элементов с выражениями, от 0 до 1")
+    parser.add_argument('--distinct', type=int, default=100_000, help="число различных выражений")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-format', default=None, help="формат результата (по умолчанию как у входа)")
+    parser.add_argument('--bulk', action='store_true', help="пакетное вычисление через numpy")
+    parser.add_argument('--data-dir', default=os.path.join(BENCHMARKS_DIR, 'data'),
+                        help="каталог для сгенерированных файлов; они переиспользуются между запусками")
+    parser.add_argument('--results', default=None, help="файл JSON для результатов")
+    parser.add_argument('--compare', default=None, help="файл JSON с результатами прошлого запуска")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--child':
+        run_child(argv[1:])
+        return 0
+
+    args = parse_args(argv)
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+    failed = False
+    for input_format in args.formats.split(','):
+        output_format = args.output_format or input_format
+        for size in map(parse_size, args.sizes.split(',')):
+            input_file, expressions = prepare_input(args.data_dir, input_format, size, args.density,
+                                                    args.distinct, args.seed)
+            output_file = os.path.join(args.data_dir, 'output' + FORMAT_EXTENSIONS[output_format])
+            size = os.path.getsize(input_file)
+            item = {'format': input_format, 'output_format': output_format, 'size': size,
+                    'density': args.density, 'bulk': args.bulk, 'expressions': expressions}
+            try:
+                measured = measure(input_file, output_file, input_format, output_format, args.bulk)
+            except RuntimeError as e:
+                failed = True
+                item['error'] = str(e)
+                print(f"{input_format:<5} {format_size(size):>7}  ОШИБКА: {e}")
+                results.append(item)
+                continue
+            finally:
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+
+            seconds = sum(measured['stages'].values())
+            item.update(stages=measured['stages'], seconds=seconds, peak_rss=measured['peak_rss'],
+                        mb_per_s=size / 1e6 / seconds, expressions_per_s=expressions / seconds)
+            results.append(item)
+            stages = ', '.join(f"{name} {value * 1000:.0f} мс" for name, value in measured['stages'].items())
+            print(f"{input_format:<5} {format_size(size):>7}  {seconds * 1000:9.1f} мс  "
+                  f"{item['mb_per_s']:7.2f} МБ/с  {item['expressions_per_s'] / 1e3:8.1f} тыс. выраж./с  "
+                  f"пик {item['peak_rss'] / 1e6:7.1f} МБ  ({stages})")
+
+    report = {
+        'commit': current_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    results_file = args.results or os.path.join(
+        BENCHMARKS_DIR, 'results', f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+    with open(results_file, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {results_file}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import random
+
+# Генераторы входных файлов любого размера: данные пишутся блоками, в памяти держится только пул строк
+
+
+def expression_pool(rng, distinct):
+    return [f"{rng.randint(0, 9999)} {rng.choice('+-*/')} {rng.randint(1, 9999)}" for _ in range(distinct)]
+
+
+def filler_pool(rng, distinct):
+    words = ('значение', 'строка', 'отчёт', 'итог', 'раздел', 'данные', 'value', 'total')
+    return [f"{rng.choice(words)} {rng.choice(words)} {rng.randint(0, 99999)}" for _ in range(distinct)]
+
+
+FORMATS = {
+    'text': {
+        'header': '',
+        'expression': '{}\n',
+        'filler': '{}\n',
+        'separator': '',
+        'footer': '',
+    },
+    'json': {
+        'header': '{\n  "expressions": [\n',
+        'expression': '    "{}"',
+        'filler': '    "{}"',
+        'separator': ',\n',
+        'footer': '\n  ]\n}\n',
+    },
+    'yaml': {
+        'header': 'expressions:\n',
+        'expression': "- '{}'\n",
+        'filler': "- '{}'\n",
+        'separator': '',
+        'footer': '',
+    },
+    'xml': {
+        'header': '<?xml version="1.0" encoding="utf-8"?>\n<calculations>\n',
+        'expression': '  <calculation><expression>{}</expression></calculation>\n',
+        'filler': '  <note>{}</note>\n',
+        'separator': '',
+        'footer': '</calculations>\n',
+    },
+    'html': {
+        'header': '<!DOCTYPE html>\n<html lang="ru">\n<head>\n<meta charset="UTF-8">\n<title>Выражения</title>\n'
+                  '<style>td { padding: 2px; }</style>\n</head>\n<body>\n<table>\n',
+        'expression': '<tr><td class="expression">{}</td></tr>\n',
+        'filler': '<tr><td class="note">{}</td></tr>\n',
+        'separator': '',
+        'footer': '</table>\n</body>\n</html>\n',
+    },
+}
+
+
+# Пишет файл формата input_format размером около size байт; density - доля элементов с выражениями,
+# distinct - число различных выражений (определяет долю попаданий в кэш движка).
+# Возвращает число записанных выражений.
+def generate(path, input_format, size, density=1.0, distinct=100_000, seed=0, batch=10_000):
+    layout = FORMATS[input_format]
+    rng = random.Random(seed)
+    expressions = [layout['expression'].format(item) for item in expression_pool(rng, distinct)]
+    fillers = [layout['filler'].format(item) for item in filler_pool(rng, max(1, distinct // 10))]
+    footer = layout['footer'].encode('utf-8')
+
+    count = 0
+    with open(path, 'wb') as file:
+        written = file.write(layout['header'].encode('utf-8'))
+        first = True
+        while written + len(footer) < size:
+            flags = [rng.random() < density for _ in range(batch)]
+            items = [rng.choice(expressions) if flag else rng.choice(fillers) for flag in flags]
+            prefix = '' if first else layout['separator']
+            block = (prefix + layout['separator'].join(items)).encode('utf-8')
+            # Последний блок обрезается по числу элементов, чтобы не превысить размер
+            if written + len(block) + len(footer) > size:
+                keep = max(1, len(items) * (size - written - len(footer)) // len(block))
+                items, flags = items[:keep], flags[:keep]
+                block = (prefix + layout['separator'].join(items)).encode('utf-8')
+            written += file.write(block)
+            count += sum(flags)
+            first = False
+        file.write(footer)
+    return count
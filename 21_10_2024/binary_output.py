@@ -0,0 +1,202 @@
+import re
+import struct
+
+
+# Запись о вычислении в формате protobuf (схема - output_files/output.proto):
+#   message Operation {
+#     sint64 left_operand = 1;
+#     Operator operator = 2;
+#     sint64 right_operand = 3;
+#     oneof result { sint64 int_result = 4; double float_result = 5; }
+#   }
+# Записи идут подряд, каждой предшествует её длина (varint), как в writeDelimitedTo.
+OPERATORS = '+-*/'
+OPERAND_PATTERN = re.compile(r'(\d+)\s*([\+\-\*\/])\s*(\d+)')
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+DOUBLE = struct.Struct('<d')
+WRITE_BATCH = 4096
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Столбцы .npy-варианта: структурированный массив без выравнивания, 34 байта на запись.
+# Как oneof в protobuf: целый результат хранится в int_result, дробный - в float_result,
+# is_float показывает, какой из них заполнен (второй равен нулю)
+NPY_DTYPE = ("[('left', '<i8'), ('operator', 'u1'), ('right', '<i8'), "
+             "('is_float', '?'), ('int_result', '<i8'), ('float_result', '<f8')]")
+NPY_RECORD = struct.Struct('<qBq?qd')
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# Заголовок резервируется заранее и переписывается, когда известно число записей
+NPY_HEADER_SIZE = 128
+
+
+def parse_expression(expression):
+    match = OPERAND_PATTERN.fullmatch(expression.strip())
+    if match is None:
+        raise ValueError(f"Выражение нельзя записать в двоичном формате: {expression}")
+    return int(match.group(1)), OPERATORS.index(match.group(2)), int(match.group(3))
+
+
+def check_int64(value):
+    if not INT64_MIN <= value <= INT64_MAX:
+        raise ValueError(f"Значение {value} не помещается в 64 бита")
+    return value
+
+
+# sint64 кодируется zigzag-преобразованием, чтобы небольшие отрицательные числа занимали мало байт
+def append_sint64(out, value):
+    if not INT64_MIN <= value <= INT64_MAX:
+        check_int64(value)
+    value = (value << 1) ^ (value >> 63)
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+# Нулевые значения полей не записываются, как принято в proto3; результат пишется всегда,
+# иначе нельзя понять, какой вариант oneof выбран. Запись не длиннее 35 байт,
+# поэтому её длина всегда занимает один байт и дописывается на место, зарезервированное заранее.
+def append_record(out, left, operator, right, result):
+    start = len(out)
+    out.append(0)
+    if left:
+        out.append(0x08)
+        append_sint64(out, left)
+    if operator:
+        out.append(0x10)
+        out.append(operator)
+    if right:
+        out.append(0x18)
+        append_sint64(out, right)
+    if isinstance(result, int):
+        out.append(0x20)
+        append_sint64(out, result)
+    else:
+        out.append(0x29)
+        out += DOUBLE.pack(result)
+    out[start] = len(out) - start - 1
+
+
+def write_protobuf(records, file):
+    count = 0
+    out = bytearray()
+    for left, operator, right, result in records:
+        append_record(out, left, operator, right, result)
+        count += 1
+        if len(out) >= WRITE_BUFFER_SIZE:
+            file.write(out)
+            out.clear()
+    file.write(out)
+    return count
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_varint(buffer, position):
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(buffer):
+            raise IndexError
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def decode_record(message):
+    left = operator = right = 0
+    result = None
+    position = 0
+    while position < len(message):
+        key, position = decode_varint(message, position)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 1:
+            value = DOUBLE.unpack_from(message, position)[0]
+            position += 8
+        elif wire_type == 0:
+            value, position = decode_varint(message, position)
+        else:
+            raise ValueError(f"Неподдерживаемый тип поля protobuf: {wire_type}")
+        if field == 1:
+            left = unzigzag(value)
+        elif field == 2:
+            operator = value
+        elif field == 3:
+            right = unzigzag(value)
+        elif field == 4:
+            result = unzigzag(value)
+        elif field == 5:
+            result = value
+    return left, OPERATORS[operator], right, result
+
+
+# Читает записи потоком: в памяти держится только текущий фрагмент файла
+def read_protobuf(file, chunk_size=1 << 20):
+    buffer = b''
+    position = 0
+    while True:
+        chunk = file.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while position < len(buffer):
+            try:
+                length, start = decode_varint(buffer, position)
+            except IndexError:
+                break
+            if start + length > len(buffer):
+                break
+            yield decode_record(buffer[start:start + length])
+            position = start + length
+        if not chunk:
+            if position < len(buffer):
+                raise ValueError("Файл protobuf обрывается посреди записи")
+            return
+
+
+def npy_header(count):
+    header = f"{{'descr': {NPY_DTYPE}, 'fortran_order': False, 'shape': ({count},), }}"
+    header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + '\n'
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+# Пишет файл .npy без numpy; прочитать его можно через numpy.load(path, mmap_mode='r')
+def write_npy(records, file):
+    start = file.tell()
+    file.write(npy_header(0))
+    count = 0
+    batch = []
+    for left, operator, right, result in records:
+        if isinstance(result, int):
+            record = NPY_RECORD.pack(check_int64(left), operator, check_int64(right), False, check_int64(result), 0.0)
+        else:
+            record = NPY_RECORD.pack(check_int64(left), operator, check_int64(right), True, 0, result)
+        batch.append(record)
+        if len(batch) >= WRITE_BATCH:
+            file.write(b''.join(batch))
+            count += len(batch)
+            batch.clear()
+    file.write(b''.join(batch))
+    count += len(batch)
+    end = file.tell()
+    file.seek(start)
+    file.write(npy_header(count))
+    file.seek(end)
+    return count
+
+
+def read_npy(file_name):
+    import numpy as np
+    return np.load(file_name, mmap_mode='r')
+
+
+BINARY_WRITERS = {
+    'protobuf': write_protobuf,
+    'npy': write_npy,
+}
@@ -0,0 +1,190 @@
+import argparse
+import base64
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from crypto_archive import DEFAULT_SEGMENT_SIZE, decrypt_stream, encrypt_stream, generate_key, read_key
+
+
+# Файл, зашифрованный ключом, выведенным из общего мастер-ключа: заголовок с солью и отпечатком
+# мастер-ключа, за ним обычный контейнер crypto_archive. Ключ файла - HKDF-SHA256(мастер-ключ, соль),
+# поэтому хранить нужно только мастер-ключ. Подмена соли даёт другой ключ и обнаруживается
+# проверкой сегментов контейнера.
+KDF_MAGIC = b'APKDF001'
+KDF_HEADER = struct.Struct('>8s8s16s')
+KDF_INFO = b'arithmetic-processor file key'
+ENCRYPTED_SUFFIX = '.encrypted'
+
+
+def key_id(master_key):
+    return hashlib.sha256(b'key id' + base64.urlsafe_b64decode(master_key)).digest()[:8]
+
+
+def derive_key(master_key, salt):
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=KDF_INFO)
+    return base64.urlsafe_b64encode(hkdf.derive(base64.urlsafe_b64decode(master_key)))
+
+
+# Мастер-ключ создаётся, если файла ещё нет; доступ к нему только у владельца
+def load_master_key(key_file_name, create=False):
+    if create and not os.path.exists(key_file_name):
+        key = generate_key()
+        fd = os.open(key_file_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(key)
+        return key
+    key = read_key(key_file_name)
+    if len(base64.urlsafe_b64decode(key)) != 32:
+        raise ValueError(f"В {key_file_name} нет 256-битного ключа")
+    return key
+
+
+def encrypt_with_master(input_file, encrypted_file, master_key, segment_size=DEFAULT_SEGMENT_SIZE):
+    salt = os.urandom(16)
+    with open(input_file, 'rb') as source, open(encrypted_file, 'wb') as target:
+        target.write(KDF_HEADER.pack(KDF_MAGIC, key_id(master_key), salt))
+        encrypt_stream(source, target, derive_key(master_key, salt), segment_size)
+    return encrypted_file
+
+
+def decrypt_with_master(encrypted_file, output_file, master_key):
+    with open(encrypted_file, 'rb') as source:
+        header = source.read(KDF_HEADER.size)
+        if len(header) < KDF_HEADER.size or header[:len(KDF_MAGIC)] != KDF_MAGIC:
+            raise ValueError("Файл зашифрован не мастер-ключом")
+        _, file_key_id, salt = KDF_HEADER.unpack(header)
+        if file_key_id != key_id(master_key):
+            raise ValueError("Файл зашифрован другим мастер-ключом")
+        with open(output_file, 'wb') as target:
+            decrypt_stream(source, target, derive_key(master_key, salt))
+    return output_file
+
+
+# Результат пишется во временный файл рядом с выходным и заменяет его только после успеха:
+# при ошибке (например, чужой мастер-ключ) существующий выходной файл остаётся нетронутым
+def run_task(function, input_file, output_file, *args):
+    temp_path = None
+    try:
+        directory = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(output_file), suffix='.tmp')
+        os.close(fd)
+        function(input_file, temp_path, *args)
+        os.replace(temp_path, output_file)
+    except Exception as e:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return input_file, output_file, 0, str(e)
+    return input_file, output_file, os.path.getsize(input_file), None
+
+
+# Обрабатывает пары (вход, выход) в пуле потоков: AES-GCM и чтение файлов отпускают GIL.
+# progress получает число обработанных файлов и байт. Возвращает словарь со списком
+# (вход, выход, байт, ошибка) в порядке задач и общей пропускной способностью.
+def run_bulk(function, pairs, args, workers=None, progress=None):
+    started = time.perf_counter()
+    results = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        futures = [executor.submit(run_task, function, input_file, output_file, *args)
+                   for input_file, output_file in pairs]
+        try:
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                done += result[2]
+                if progress is not None:
+                    progress(len(results), done)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    seconds = time.perf_counter() - started
+    return {
+        'results': results,
+        'files': len(results),
+        'failed': sum(1 for result in results if result[3] is not None),
+        'bytes': done,
+        'seconds': seconds,
+        'bytes_per_second': done / seconds if seconds else 0.0,
+    }
+
+
+def encrypt_files(pairs, master_key, workers=None, segment_size=DEFAULT_SEGMENT_SIZE, progress=None):
+    return run_bulk(encrypt_with_master, pairs, (master_key, segment_size), workers, progress)
+
+
+def decrypt_files(pairs, master_key, workers=None, progress=None):
+    return run_bulk(decrypt_with_master, pairs, (master_key,), workers, progress)
+
+
+# Пары (вход, выход) для файлов и каталогов; структура каталогов сохраняется в output_dir
+def collect_pairs(paths, output_dir, decrypt):
+    pairs = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(directory, file_name)
+                     for directory, _, file_names in os.walk(path) for file_name in sorted(file_names)]
+            base = path
+        else:
+            files = [path]
+            base = os.path.dirname(path)
+        for input_file in files:
+            if decrypt != input_file.endswith(ENCRYPTED_SUFFIX):
+                continue
+            output_file = input_file[:-len(ENCRYPTED_SUFFIX)] if decrypt else input_file + ENCRYPTED_SUFFIX
+            if output_dir is not None:
+                output_file = os.path.join(output_dir, os.path.relpath(output_file, base))
+            pairs.append((input_file, output_file))
+    return pairs
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m bulk_crypto",
+        description="Пакетное шифрование и расшифровка файлов одним мастер-ключом в нескольких потоках.")
+    parser.add_argument("action", choices=("encrypt", "decrypt"))
+    parser.add_argument("paths", nargs="+", help="файлы и каталоги")
+    parser.add_argument("-k", "--key", required=True,
+                        help="файл мастер-ключа; при шифровании создаётся, если его нет")
+    parser.add_argument("-o", "--output-dir", help="каталог для результатов (по умолчанию рядом с исходными файлами)")
+    parser.add_argument("-j", "--workers", type=int, help="число потоков")
+    parser.add_argument("--segment-kb", type=int, default=DEFAULT_SEGMENT_SIZE >> 10,
+                        help="размер сегмента контейнера в КБ")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    decrypt = args.action == 'decrypt'
+    try:
+        master_key = load_master_key(args.key, create=not decrypt)
+    except (OSError, ValueError) as e:
+        print(f"ОШИБКА {args.key}: {e}", file=sys.stderr)
+        return 1
+
+    pairs = collect_pairs(args.paths, args.output_dir, decrypt)
+    if decrypt:
+        summary = decrypt_files(pairs, master_key, args.workers)
+    else:
+        summary = encrypt_files(pairs, master_key, args.workers, args.segment_kb << 10)
+
+    for input_file, _, _, error in summary['results']:
+        if error is not None:
+            print(f"ОШИБКА {input_file}: {error}", file=sys.stderr)
+    print(f"Файлов: {summary['files']}, с ошибками: {summary['failed']}, "
+          f"{summary['bytes'] / 1e6:.2f} МБ за {summary['seconds']:.2f} с "
+          f"({summary['bytes_per_second'] / 1e6:.2f} МБ/с)")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import numpy as np
+
+from text_stream import EXPRESSION_PATTERN, TAIL_PATTERN, rewrite_buffer as rewrite_buffer_scalar
+
+
+# Операнды не длиннее 9 цифр: произведение помещается в int64, частное считается в float64 так же, как в Python
+MAX_OPERAND_DIGITS = 9
+
+# Классы символов по коду; все не-ASCII символы отнесены к прочим
+DIGIT, WHITESPACE, OPERATOR, OTHER = 0, 1, 2, 3
+CLASSES = np.full(256, OTHER, dtype=np.int8)
+CLASSES[48:58] = DIGIT
+CLASSES[np.frombuffer(b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f', dtype=np.uint8)] = WHITESPACE
+CLASSES[np.frombuffer(b'+-*/', dtype=np.uint8)] = OPERATOR
+PLUS, MINUS, TIMES, DIVIDE = b'+-*/'
+
+
+# ASCII-текст кодируется по байту на символ, остальной - по четыре; индексы кодов совпадают с индексами строки
+def to_codes(text):
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def from_codes(codes):
+    return codes.tobytes().decode('ascii' if codes.dtype == np.uint8 else 'utf-32-le')
+
+
+# Не-ASCII цифры и пробелы регулярное выражение тоже находит, такие тексты обрабатываются по одному выражению
+def has_unicode_tokens(codes):
+    if codes.dtype == np.uint8:
+        return False
+    wide = np.unique(codes[codes > 127]).tolist()
+    return any(chr(code).isdigit() or chr(code).isspace() for code in wide)
+
+
+def classify(codes):
+    if codes.dtype == np.uint8:
+        return CLASSES[codes]
+    return CLASSES[np.minimum(codes, 255)]
+
+
+# Находит те же выражения, что и EXPRESSION_PATTERN: соседние серии цифр, между которыми только
+# пробельные символы и ровно один оператор. Из цепочки "1 + 2 + 3" берётся "1 + 2", и поиск
+# продолжается после второго операнда, поэтому внутри цепочки совпадения идут через одно.
+# Возвращает массивы: начало выражения, конец левого операнда, позиция оператора,
+# начало правого операнда, конец выражения.
+def find_expressions(codes):
+    classes = classify(codes)
+    digit = classes == DIGIT
+    edges = np.diff(digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) < 2:
+        return (starts[:0],) * 5
+
+    # Между операндами должен быть ровно один значимый символ, и это оператор
+    significant = np.flatnonzero(classes >= OPERATOR)
+    first = np.searchsorted(significant, ends[:-1])
+    count = np.searchsorted(significant, starts[1:]) - first
+    candidate = count == 1
+    candidate[candidate] = classes[significant[first[candidate]]] == OPERATOR
+
+    index = np.arange(len(candidate))
+    chain = candidate & ~np.concatenate(([False], candidate[:-1]))
+    chain_start = np.maximum.accumulate(np.where(chain, index, 0))
+    left = np.flatnonzero(candidate & ((index - chain_start) % 2 == 0))
+    return starts[left], ends[left], significant[first[left]], starts[left + 1], ends[left + 1]
+
+
+def parse_operands(codes, starts, ends):
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    last = len(codes) - 1
+    for offset in range(min(int(lengths.max()), MAX_OPERAND_DIGITS)):
+        digits = codes[np.minimum(starts + offset, last)].astype(np.int64) - 48
+        values = np.where(offset < lengths, values * 10 + digits, values)
+    return values, lengths > MAX_OPERAND_DIGITS
+
+
+# Десятичная запись целых без создания строк: цифры раскладываются в матрицу, выровненную вправо,
+# и из неё берутся только значащие позиции. Возвращает длины записей и их коды подряд.
+def format_integers(values, dtype):
+    negative = values < 0
+    magnitude = np.abs(values)
+    width = len(str(int(magnitude.max()))) + 1 if len(values) else 1
+
+    matrix = np.empty((len(values), width), dtype=dtype)
+    remaining = magnitude.copy()
+    digits = np.ones(len(values), dtype=np.int64)
+    for column in range(width - 1, -1, -1):
+        matrix[:, column] = remaining % 10 + 48
+        remaining //= 10
+        digits += remaining > 0
+
+    lengths = digits + negative
+    rows = np.flatnonzero(negative)
+    matrix[rows, width - lengths[rows]] = MINUS
+    return lengths, matrix[np.arange(width) >= (width - lengths)[:, None]]
+
+
+# Записи результатов состоят только из ASCII-символов
+def format_strings(strings, dtype):
+    encoded = ''.join(strings).encode('ascii' if dtype == np.uint8 else 'utf-32-le')
+    return np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)), np.frombuffer(encoded, dtype=dtype)
+
+
+def starts_of(sizes):
+    return np.cumsum(sizes) - sizes
+
+
+# Склеивает отрезки source[offsets[i]:offsets[i] + sizes[i]] одной выборкой
+def gather(source, offsets, sizes):
+    return source[np.repeat(offsets - starts_of(sizes), sizes) + np.arange(int(sizes.sum()))]
+
+
+# Возвращает длины записей результатов, их смещения и массив кодов, в котором они лежат,
+# или None, если выражения нужно вычислять по одному
+def evaluate_expressions(text, codes, expressions, evaluate):
+    begin, left_end, positions, right_start, end = expressions
+    a, wide_left = parse_operands(codes, begin, left_end)
+    b, wide_right = parse_operands(codes, right_start, end)
+    operators = codes[positions]
+    divide = operators == DIVIDE
+    # Длинные операнды вычисляются движком по одному
+    wide = wide_left | wide_right
+    b[wide] = 1
+
+    if (divide & (b == 0)).any():
+        return None
+
+    integer = ~(divide | wide)
+    x, y, operator = a[integer], b[integer], operators[integer]
+    integer_lengths, pool = format_integers(
+        np.where(operator == PLUS, x + y, np.where(operator == MINUS, x - y, x * y)), codes.dtype)
+    lengths = np.empty(len(begin), dtype=np.int64)
+    offsets = np.empty(len(begin), dtype=np.int64)
+    lengths[integer] = integer_lengths
+    offsets[integer] = starts_of(integer_lengths)
+    if integer.all():
+        return lengths, offsets, pool
+
+    pools = [pool]
+    size = len(pool)
+    quotient = np.flatnonzero(divide & ~wide)
+    long = np.flatnonzero(wide)
+    # Частные переводятся в строку через float Python, чтобы запись совпадала с str()
+    for indices, strings in (
+            (quotient, list(map(str, (a[quotient] / b[quotient]).tolist()))),
+            (long, [str(evaluate(text[begin[index]:end[index]])) for index in long.tolist()])):
+        if len(indices):
+            string_lengths, string_codes = format_strings(strings, codes.dtype)
+            lengths[indices] = string_lengths
+            offsets[indices] = starts_of(string_lengths) + size
+            pools.append(string_codes)
+            size += len(string_codes)
+    return lengths, offsets, np.concatenate(pools)
+
+
+# Собирает text[:stop] с подставленными результатами выражений, целиком лежащих до stop
+def rewrite_range(text, codes, expressions, stop, evaluate):
+    keep = expressions[4] <= stop
+    if not keep.all():
+        expressions = tuple(array[keep] for array in expressions)
+    if not len(expressions[0]):
+        return text[:stop]
+
+    results = evaluate_expressions(text, codes, expressions, evaluate)
+    if results is None:
+        # Деление на ноль: вычисляем по порядку, чтобы ошибка была той же, что и без numpy
+        return EXPRESSION_PATTERN.sub(lambda match: str(evaluate(match.group(0))), text[:stop])
+    lengths, offsets, pool = results
+
+    # Выход - чередование кусков исходного текста и результатов, к исходным кодам приписываются коды результатов
+    begin, end = expressions[0], expressions[4]
+    sources = np.empty(2 * len(lengths) + 1, dtype=np.int64)
+    sources[0::2] = np.concatenate(([0], end))
+    sources[1::2] = offsets + stop
+    sizes = np.empty_like(sources)
+    sizes[0::2] = np.concatenate((begin, [stop])) - sources[0::2]
+    sizes[1::2] = lengths
+    return from_codes(gather(np.concatenate((codes[:stop], pool)), sources, sizes))
+
+
+def rewrite_text(text, evaluate):
+    codes = to_codes(text)
+    if has_unicode_tokens(codes):
+        return EXPRESSION_PATTERN.sub(lambda match: str(evaluate(match.group(0))), text)
+    return rewrite_range(text, codes, find_expressions(codes), len(text), evaluate)
+
+
+# Аналог text_stream.rewrite_buffer для rewrite_stream
+def rewrite_buffer(buffer, evaluate, final=False):
+    codes = to_codes(buffer)
+    if has_unicode_tokens(codes):
+        return rewrite_buffer_scalar(buffer, evaluate, final)
+    expressions = find_expressions(codes)
+
+    cut = len(buffer)
+    if not final:
+        last_begin = int(expressions[0][-1]) if len(expressions[0]) else 0
+        tail = TAIL_PATTERN.search(buffer, last_begin)
+        if tail:
+            cut = tail.start()
+            # Последнее выражение может продолжиться в следующем фрагменте
+            if len(expressions[0]) and expressions[4][-1] > cut:
+                cut = last_begin
+    return rewrite_range(buffer, codes, expressions, cut, evaluate), buffer[cut:]
@@ -0,0 +1,166 @@
+import base64
+import os
+import shutil
+import struct
+import zipfile
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from progress import open_input
+
+
+# Контейнер: заголовок и сегменты фиксированного размера, каждый зашифрован AES-GCM отдельно.
+# Номер сегмента и признак последнего сегмента входят в nonce, заголовок - в связанные данные,
+# поэтому перестановка, удаление и усечение сегментов обнаруживаются при расшифровке.
+MAGIC = b'APSTRM01'
+HEADER = struct.Struct('>8sI7s')
+TAG_SIZE = 16
+DEFAULT_SEGMENT_SIZE = 1 << 20
+
+COMPRESSION_METHODS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflated': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+
+
+def generate_key():
+    return base64.urlsafe_b64encode(AESGCM.generate_key(bit_length=256))
+
+
+def key_file_for(encrypted_file):
+    return encrypted_file.replace('.encrypted', '.key')
+
+
+def read_key(key_file_name):
+    with open(key_file_name, 'rb') as key_file:
+        return key_file.read().strip()
+
+
+def _nonce(prefix, index, last):
+    return prefix + struct.pack('>I?', index, last)
+
+
+def _read_header(source):
+    header = source.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Файл не является зашифрованным контейнером")
+    magic, segment_size, prefix = HEADER.unpack(header)
+    if magic != MAGIC or not segment_size:
+        raise ValueError("Файл не является зашифрованным контейнером")
+    return header, segment_size, prefix
+
+
+def encrypt_stream(source, target, key, segment_size=DEFAULT_SEGMENT_SIZE):
+    cipher = AESGCM(base64.urlsafe_b64decode(key))
+    prefix = os.urandom(HEADER.size - len(MAGIC) - 4)
+    header = HEADER.pack(MAGIC, segment_size, prefix)
+    target.write(header)
+
+    index = 0
+    segment = source.read(segment_size)
+    while True:
+        next_segment = source.read(segment_size)
+        last = not next_segment
+        target.write(cipher.encrypt(_nonce(prefix, index, last), segment, header))
+        if last:
+            return
+        segment = next_segment
+        index += 1
+
+
+def decrypt_stream(source, target, key):
+    cipher = AESGCM(base64.urlsafe_b64decode(key))
+    header, segment_size, prefix = _read_header(source)
+    encrypted_size = segment_size + TAG_SIZE
+
+    index = 0
+    segment = source.read(encrypted_size)
+    while True:
+        next_segment = source.read(encrypted_size)
+        last = not next_segment
+        try:
+            target.write(cipher.decrypt(_nonce(prefix, index, last), segment, header))
+        except InvalidTag:
+            raise ValueError(f"Сегмент {index} повреждён или ключ неверен")
+        if last:
+            return
+        segment = next_segment
+        index += 1
+
+
+# Расшифровывает только сегменты, покрывающие запрошенный диапазон открытого текста
+def decrypt_range(encrypted_file, key, offset, length):
+    cipher = AESGCM(base64.urlsafe_b64decode(key))
+    with open(encrypted_file, 'rb') as source:
+        header, segment_size, prefix = _read_header(source)
+        encrypted_size = segment_size + TAG_SIZE
+        body_size = os.fstat(source.fileno()).st_size - HEADER.size
+        segments = max(1, -(-body_size // encrypted_size))
+
+        first = offset // segment_size
+        last = min((offset + max(length, 1) - 1) // segment_size, segments - 1)
+        pieces = []
+        for index in range(first, last + 1):
+            source.seek(HEADER.size + index * encrypted_size)
+            try:
+                pieces.append(cipher.decrypt(_nonce(prefix, index, index == segments - 1),
+                                             source.read(encrypted_size), header))
+            except InvalidTag:
+                raise ValueError(f"Сегмент {index} повреждён или ключ неверен")
+    start = offset - first * segment_size
+    return b''.join(pieces)[start:start + length]
+
+
+def is_stream_container(file_name):
+    with open(file_name, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+# progress получает число прочитанных байт исходного файла и может прервать работу, выбросив Cancelled
+def encrypt_file(input_file, encrypted_file=None, key=None, segment_size=DEFAULT_SEGMENT_SIZE, progress=None):
+    encrypted_file = encrypted_file or input_file + '.encrypted'
+    if key is None:
+        key = generate_key()
+        with open(key_file_for(encrypted_file), 'wb') as key_file:
+            key_file.write(key)
+
+    with open_input(input_file, progress) as source, open(encrypted_file, 'wb') as target:
+        encrypt_stream(source, target, key, segment_size)
+    return encrypted_file
+
+
+def decrypt_file(encrypted_file, output_file, key=None, progress=None):
+    if key is None:
+        key = read_key(key_file_for(encrypted_file))
+
+    if not is_stream_container(encrypted_file):
+        # Файлы, зашифрованные прежней версией одним токеном Fernet
+        with open(encrypted_file, 'rb') as file:
+            decrypted_data = Fernet(key).decrypt(file.read())
+        with open(output_file, 'wb') as dec_file:
+            dec_file.write(decrypted_data)
+        return output_file
+
+    with open_input(encrypted_file, progress) as source, open(output_file, 'wb') as target:
+        decrypt_stream(source, target, key)
+    return output_file
+
+
+# ZipFile.write копирует файл в архив блоками, не читая его целиком
+def archive_file(input_file, archive_file_name=None, compression='deflated', compresslevel=6, progress=None):
+    archive_file_name = archive_file_name or input_file + '.zip'
+    with zipfile.ZipFile(archive_file_name, 'w', compression=COMPRESSION_METHODS[compression],
+                         compresslevel=compresslevel) as zipf:
+        if progress is None:
+            zipf.write(input_file, os.path.basename(input_file))
+        else:
+            # Размер заранее неизвестен архиву, поэтому для больших файлов ZIP64 включается явно
+            force_zip64 = os.path.getsize(input_file) > zipfile.ZIP64_LIMIT // 2
+            with open_input(input_file, progress) as source, \
+                    zipf.open(os.path.basename(input_file), 'w', force_zip64=force_zip64) as target:
+                shutil.copyfileobj(source, target, DEFAULT_SEGMENT_SIZE)
+    return archive_file_name
@@ -0,0 +1,139 @@
+import re
+import operator
+import threading
+from collections import OrderedDict
+
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\d+\.\d*|\.\d+|\d+)|(\S))', re.ASCII)
+
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+UNARY_MINUS = 'neg'
+
+
+def normalize(expression):
+    return ' '.join(expression.split())
+
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    length = len(expression)
+    while position < length:
+        match = TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            break
+        number, symbol = match.groups()
+        if number is not None:
+            tokens.append(float(number) if '.' in number else int(number))
+        elif symbol in OPERATORS or symbol in '()':
+            tokens.append(symbol)
+        else:
+            raise ValueError(f"Недопустимый символ: {symbol!r}")
+        position = match.end()
+    return tokens
+
+
+# Переводим выражение в обратную польскую запись (алгоритм сортировочной станции)
+def compile_expression(expression):
+    output = []
+    stack = []
+    expect_operand = True
+
+    for token in tokenize(expression):
+        if not isinstance(token, str):
+            if not expect_operand:
+                raise ValueError("Пропущен оператор")
+            output.append(token)
+            expect_operand = False
+        elif token == '(':
+            if not expect_operand:
+                raise ValueError("Пропущен оператор")
+            stack.append(token)
+        elif token == ')':
+            if expect_operand:
+                raise ValueError("Пропущен операнд")
+            while stack and stack[-1] != '(':
+                output.append(stack.pop())
+            if not stack:
+                raise ValueError("Несбалансированные скобки")
+            stack.pop()
+        elif expect_operand:
+            if token == '-':
+                stack.append(UNARY_MINUS)
+            elif token != '+':
+                raise ValueError("Пропущен операнд")
+        else:
+            while stack and stack[-1] != '(' and (
+                    stack[-1] == UNARY_MINUS or PRECEDENCE[stack[-1]] >= PRECEDENCE[token]):
+                output.append(stack.pop())
+            stack.append(token)
+            expect_operand = True
+
+    if expect_operand:
+        raise ValueError("Пропущен операнд")
+    while stack:
+        token = stack.pop()
+        if token == '(':
+            raise ValueError("Несбалансированные скобки")
+        output.append(token)
+    return tuple(output)
+
+
+def execute(program):
+    stack = []
+    for token in program:
+        if token == UNARY_MINUS:
+            stack.append(-stack.pop())
+        elif isinstance(token, str):
+            right = stack.pop()
+            left = stack.pop()
+            stack.append(OPERATORS[token](left, right))
+        else:
+            stack.append(token)
+    return stack[0]
+
+
+# Кэш общий для потоков (ui_jobs, service --threads): обращения к OrderedDict идут под блокировкой,
+# само вычисление - вне её
+class ExpressionEngine:
+    def __init__(self, cache_size=65536):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, expression):
+        key = normalize(expression)
+        cache = self.cache
+        with self.lock:
+            if key in cache:
+                self.hits += 1
+                cache.move_to_end(key)
+                return cache[key]
+            self.misses += 1
+
+        result = execute(compile_expression(key))
+        if self.cache_size:
+            with self.lock:
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+default_engine = ExpressionEngine()
@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from arithmetic_processor import ArithmeticProcessor
+from text_stream import DEFAULT_CHUNK_SIZE, EXPRESSION_PATTERN, TAIL_PATTERN
+
+
+# Обрабатывает дописываемый текстовый файл по мере роста: в контрольной точке хранятся устройство и inode
+# входного файла, число обработанных байт и размер выходного файла. Результаты дописываются в конец
+# выходного файла; при перезапуске он обрезается до размера из контрольной точки, поэтому данные,
+# записанные перед сбоем, но не отмеченные в контрольной точке, не дублируются.
+class Follower:
+    def __init__(self, input_file, output_file, checkpoint_file=None, chunk_size=DEFAULT_CHUNK_SIZE, metrics=None):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.checkpoint_file = checkpoint_file or output_file + '.checkpoint'
+        self.chunk_size = chunk_size
+        self.processor = ArithmeticProcessor(input_file, output_file, 'text', 'text', metrics=metrics)
+        self.source = None
+        self.state = self.load_checkpoint()
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {'device': None, 'inode': None, 'offset': 0, 'output_size': 0}
+        except ValueError as e:
+            raise ValueError(f"Повреждена контрольная точка {self.checkpoint_file}: {e}")
+
+    def save_checkpoint(self):
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_file))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file)
+        os.replace(temp_path, self.checkpoint_file)
+
+    # Одна проверка входного файла; возвращает число обработанных байт
+    def poll(self):
+        try:
+            stat = os.stat(self.input_file)
+        except FileNotFoundError:
+            # Во время ротации файла может ненадолго не быть
+            return 0
+
+        consumed = 0
+        identity = [stat.st_dev, stat.st_ino]
+        if identity != [self.state['device'], self.state['inode']]:
+            if self.source is not None:
+                # Ротация: сначала дочитывается прежний файл, он больше не растёт
+                consumed += self.drain(final=True)
+                self.source.close()
+                self.source = None
+            # Новый файл начинается с начала. Если ротация случилась, пока обработка была остановлена,
+            # необработанный конец прежнего файла здесь уже недоступен.
+            self.state.update(device=stat.st_dev, inode=stat.st_ino, offset=0)
+            self.save_checkpoint()
+        elif stat.st_size < self.state['offset']:
+            # Файл усечён на месте (например, logrotate с copytruncate)
+            self.state['offset'] = 0
+            self.save_checkpoint()
+
+        if self.source is None:
+            self.source = open(self.input_file, 'rb')
+            opened = os.fstat(self.source.fileno())
+            if [opened.st_dev, opened.st_ino] != identity:
+                # Файл успели заменить между stat и open: разберёмся при следующей проверке
+                self.source.close()
+                self.source = None
+                return consumed
+        return consumed + self.drain(final=False)
+
+    # Обрабатывает данные после сохранённого смещения: только до последнего перевода строки
+    # и без хвоста, который может оказаться началом выражения. final - дочитать файл целиком.
+    def drain(self, final):
+        consumed = 0
+        size = self.chunk_size
+        with self.open_output() as target:
+            while True:
+                self.source.seek(self.state['offset'])
+                data = self.source.read(size)
+                if not data:
+                    break
+                at_eof = self.state['offset'] + len(data) >= os.fstat(self.source.fileno()).st_size
+                end = len(data) if final and at_eof else data.rfind(b'\n') + 1
+                processed, rest = self.rewrite(data[:end].decode('utf-8'), final and at_eof)
+                done = end - len(rest.encode('utf-8'))
+                if done == 0:
+                    if at_eof:
+                        # Неполная строка дождётся продолжения
+                        break
+                    # Строка или хвост длиннее фрагмента
+                    size *= 2
+                    continue
+
+                written = target.write(processed.encode('utf-8'))
+                target.flush()
+                os.fsync(target.fileno())
+                self.state['offset'] += done
+                self.state['output_size'] += written
+                self.save_checkpoint()
+                consumed += done
+                size = self.chunk_size
+                if at_eof:
+                    break
+        return consumed
+
+    def open_output(self):
+        target = open(self.output_file, 'ab')
+        size = target.seek(0, os.SEEK_END)
+        if size > self.state['output_size']:
+            target.truncate(self.state['output_size'])
+        else:
+            self.state['output_size'] = size
+        return target
+
+    # В отличие от rewrite_buffer, хвост ищется после конца последнего выражения: буфер кончается
+    # переводом строки, поэтому найденные выражения уже не могут продолжиться
+    def rewrite(self, text, final):
+        matches = list(EXPRESSION_PATTERN.finditer(text))
+        cut = len(text)
+        if not final:
+            tail = TAIL_PATTERN.search(text, matches[-1].end() if matches else 0)
+            if tail:
+                cut = tail.start()
+
+        pieces = []
+        last = 0
+        for match in matches:
+            start, end = match.span()
+            pieces.append(text[last:start])
+            pieces.append(str(self.processor.evaluate_expression(match.group(0))))
+            last = end
+        pieces.append(text[last:cut])
+        return ''.join(pieces), text[cut:]
+
+    def follow(self, interval=1.0):
+        while True:
+            if not self.poll():
+                time.sleep(interval)
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m follow",
+        description="Обработка дописываемого текстового файла: вычисляются только новые строки.")
+    parser.add_argument("input", help="входной текстовый файл")
+    parser.add_argument("-o", "--output", required=True, help="выходной файл, результаты дописываются в конец")
+    parser.add_argument("--checkpoint", help="файл контрольной точки (по умолчанию <output>.checkpoint)")
+    parser.add_argument("--interval", type=float, default=1.0, help="пауза между проверками в секундах")
+    parser.add_argument("--once", action="store_true", help="обработать накопившиеся строки и выйти")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    follower = Follower(args.input, args.output, args.checkpoint)
+    try:
+        if args.once:
+            follower.poll()
+        else:
+            follower.follow(args.interval)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"ОШИБКА {args.input}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        follower.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import re
+
+from text_stream import TAIL_PATTERN
+
+
+# Один проход регулярного выражения делит документ на разметку, которая выводится без изменений,
+# и выражения в тексте между ней. Выражение не может содержать '<' и '>', поэтому ни одно
+# совпадение не пересекает границу тега, а текст внутри тегов поглощается самими тегами.
+TOKEN_PATTERN = re.compile(r'''
+    (?P<raw>
+        <(?P<name>script|style)(?:[\s/](?:"[^"]*"|'[^']*'|[^'">])*)?>
+        (?:.*?(?=</(?P=name)[\s/>])|(?P<unclosed>.*))
+    )
+  | (?P<comment><!--.*?-->|<!\[CDATA\[.*?\]\]>|<!(?:--|\[CDATA\[)(?P<open>.*))
+  | (?P<markup>
+        <[!?][^>]*>
+      | </[a-z][^>]*>
+      | <[a-z](?:"[^"]*"|'[^']*'|[^'">])*>
+    )
+  | (?P<partial><(?:[a-z/!?](?:"[^"]*"|'[^']*'|[^'">])*(?:"[^"]*|'[^']*)?)?\Z)
+  | (?P<expression>\d+\s*[\+\-\*\/]\s*\d+)
+''', re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+# Незакрытый тег длиннее этого считается текстом, а не недочитанной разметкой
+MAX_MARKUP_SIZE = 1 << 16
+
+
+def tokenize(buffer):
+    tokens = list(TOKEN_PATTERN.finditer(buffer))
+    while tokens and tokens[-1].lastgroup == 'partial' and tokens[-1].end() - tokens[-1].start() > MAX_MARKUP_SIZE:
+        start = tokens.pop().start()
+        tokens.extend(TOKEN_PATTERN.finditer(buffer, start + 1))
+    return tokens
+
+
+# Возвращает обработанную часть буфера и остаток, который нужно дополнить следующим фрагментом.
+# Выражения заменяются только в тексте документа; теги, комментарии, <script> и <style>
+# переносятся в выход без изменений.
+def rewrite_html_buffer(buffer, evaluate, final=False):
+    tokens = tokenize(buffer)
+
+    cut = len(buffer)
+    if not final and tokens:
+        last = tokens[-1]
+        if last.lastgroup == 'partial' or last.group('unclosed') is not None or last.group('open') is not None:
+            cut = last.start()
+            tokens.pop()
+        else:
+            tail = TAIL_PATTERN.search(buffer, last.start() if last.lastgroup == 'expression' else last.end())
+            if tail:
+                cut = tail.start()
+                # Последнее выражение может продолжиться в следующем фрагменте
+                if last.end() > cut:
+                    cut = last.start()
+                    tokens.pop()
+    elif not final:
+        tail = TAIL_PATTERN.search(buffer)
+        if tail:
+            cut = tail.start()
+
+    pieces = []
+    position = 0
+    for token in tokens:
+        if token.lastgroup == 'expression':
+            start, end = token.span()
+            pieces.append(buffer[position:start])
+            pieces.append(str(evaluate(token.group(0))))
+            position = end
+    pieces.append(buffer[position:cut])
+    return ''.join(pieces), buffer[cut:]
@@ -0,0 +1,137 @@
+import json
+import re
+
+from text_stream import DEFAULT_CHUNK_SIZE
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = '0123456789.eE+-'
+INDENT = '  '
+
+# Подряд идущие скалярные элементы массива, за каждым из которых уже прочитана запятая:
+# такие элементы заведомо целиком находятся в буфере и разбираются одним вызовом json.loads
+SCALAR = r'(?:"(?:[^"\\]|\\.)*"|-?[0-9][0-9.eE+\-]*|true|false|null)'
+SCALAR_RUN = re.compile(rf'(?:{SCALAR}[ \t\n\r]*,[ \t\n\r]*)+')
+# Длина одного прогона ограничена: на длинном совпадении стек повторений re растёт пропорционально
+MAX_RUN_SIZE = 1 << 16
+
+DECODER = json.JSONDecoder()
+
+
+# Читает JSON из потока по фрагментам; массивы и объекты разбираются поэлементно,
+# и в памяти находится только текущий фрагмент, а не весь документ
+class JsonStreamReader:
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    # Дочитывает не меньше фрагмента; при длинных значениях объём чтения удваивается
+    def fill(self):
+        if self.position > self.chunk_size:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        chunk = self.source.read(max(self.chunk_size, len(self.buffer) - self.position))
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+        return bool(chunk)
+
+    def peek(self):
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            found = self.peek() or 'конец файла'
+            raise ValueError(f"Ошибка парсинга JSON: ожидалось {char!r}, найдено {found!r}")
+        self.position += 1
+
+    def skip(self, char):
+        if self.peek() == char:
+            self.position += 1
+            return True
+        return False
+
+    def scalar_run(self):
+        run = SCALAR_RUN.match(self.buffer, self.position, self.position + MAX_RUN_SIZE)
+        if run is None:
+            return None
+        try:
+            values = json.loads('[' + run.group(0).rstrip(' \t\n\r')[:-1] + ']')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ошибка парсинга JSON: {e}")
+        self.position = run.end()
+        return values
+
+    # Число или литерал, оканчивающийся на границе буфера, может продолжаться в следующем фрагменте
+    def scalar(self):
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if self.eof or not self.fill():
+                    raise ValueError(f"Ошибка парсинга JSON: {e}")
+                continue
+            if (end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARS) or self.eof or not self.fill():
+                self.position = end
+                return value
+
+
+def rewrite_value(reader, target, transform, depth):
+    char = reader.peek()
+    if not char:
+        raise ValueError("Ошибка парсинга JSON: неожиданный конец файла")
+    if char not in '[{':
+        target.write(json.dumps(transform(reader.scalar()), ensure_ascii=False))
+        return
+
+    closing = ']' if char == '[' else '}'
+    reader.position += 1
+    if reader.skip(closing):
+        target.write(char + closing)
+        return
+
+    target.write(char)
+    indent = '\n' + INDENT * (depth + 1)
+    first = True
+    while True:
+        target.write(indent if first else ',' + indent)
+        first = False
+        if char == '{':
+            key = reader.scalar()
+            if not isinstance(key, str):
+                raise ValueError("Ошибка парсинга JSON: ключ объекта должен быть строкой")
+            reader.expect(':')
+            target.write(json.dumps(key, ensure_ascii=False) + ': ')
+        elif reader.peek() not in '[{':
+            values = reader.scalar_run()
+            if values:
+                # Без indent json.dumps работает на C; разделитель сам даёт отступы как у indent=2
+                target.write(json.dumps([transform(value) for value in values], ensure_ascii=False,
+                                        separators=(',' + indent, ': '))[1:-1])
+                continue
+        rewrite_value(reader, target, transform, depth + 1)
+        if reader.skip(','):
+            continue
+        reader.expect(closing)
+        break
+    target.write('\n' + INDENT * depth + closing)
+
+
+# Пишет в target тот же документ, что json.dump(..., ensure_ascii=False, indent=2),
+# применяя transform к каждому скалярному значению (ключи не изменяются)
+def rewrite_json_stream(source, target, transform, chunk_size=DEFAULT_CHUNK_SIZE):
+    reader = JsonStreamReader(source, chunk_size)
+    if not reader.peek():
+        raise ValueError("Ошибка парсинга JSON: пустой документ")
+    rewrite_value(reader, target, transform, 0)
+    if reader.peek():
+        raise ValueError("Ошибка парсинга JSON: лишние данные после документа")
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+# Метрики одного или нескольких запусков ArithmeticProcessor: время и число вызовов по стадиям
+# и счётчики (байты, вычисленные выражения, попадания в кэш, ошибки).
+# Наблюдатели вызываются как observer(стадия, секунды, metrics) по завершении каждой стадии;
+# время вычисления отдельных выражений накапливается без уведомлений, чтобы не замедлять обработку.
+class Metrics:
+    def __init__(self, observers=()):
+        self.stages = {}
+        self.counters = {}
+        # Текущие значения (например, число запросов в обработке); при объединении не суммируются
+        self.gauges = {}
+        self.observers = list(observers)
+
+    def subscribe(self, observer):
+        self.observers.append(observer)
+        return observer
+
+    def add(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.gauges[name] = value
+
+    def add_time(self, name, seconds, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = [0, 0.0]
+        stage[0] += calls
+        stage[1] += seconds
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - started
+            self.add_time(name, seconds)
+            for observer in self.observers:
+                observer(name, seconds, self)
+
+    def snapshot(self):
+        return {
+            'stages': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.stages.items()},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+    # Добавляет метрики другого процесса, полученные через snapshot
+    def merge(self, snapshot):
+        for name, stage in snapshot['stages'].items():
+            self.add_time(name, stage['seconds'], stage['calls'])
+        for name, value in snapshot['counters'].items():
+            self.add(name, value)
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    # Текстовый формат Prometheus: стадии и счётчики - накопительные счётчики, gauges - текущие значения
+    def to_prometheus(self, prefix='arithmetic_processor'):
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Время, проведённое в стадии обработки.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds!r}'
+                  for name, (_, seconds) in sorted(self.stages.items())]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Число выполнений стадии обработки.",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {calls}'
+                  for name, (calls, _) in sorted(self.stages.items())]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    # Формат выбирается по расширению: .prom - Prometheus, иначе JSON. Файл заменяется целиком,
+    # чтобы сборщик метрик никогда не прочитал его наполовину записанным.
+    def dump(self, file_name):
+        content = self.to_prometheus() if file_name.endswith('.prom') else self.to_json()
+        directory = os.path.dirname(os.path.abspath(file_name))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(temp_path, file_name)
@@ -0,0 +1,35 @@
+import io
+
+
+class Cancelled(Exception):
+    pass
+
+
+# Файл только для чтения, который сообщает о числе прочитанных байт при каждом обращении к диску.
+# Обработчик progress может прервать работу, выбросив Cancelled: чтение идёт фрагментами,
+# поэтому отмена срабатывает не позже, чем через один фрагмент.
+class ProgressReader(io.RawIOBase):
+    def __init__(self, raw, progress):
+        self.raw = raw
+        self.progress = progress
+        self.done = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        if count:
+            self.done += count
+        self.progress(self.done)
+        return count
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def open_input(file_name, progress=None, buffer_size=1 << 16):
+    if progress is None:
+        return open(file_name, 'rb')
+    return io.BufferedReader(ProgressReader(open(file_name, 'rb', buffering=0), progress), buffer_size)
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # На Windows межпроцессной блокировки нет: кэш остаётся корректным, но статистика может терять обновления
+    fcntl = None
+
+
+# Меняется при изменении правил вычисления или сериализации, чтобы старые результаты не использовались
+CACHE_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_SIZE = 1 << 30
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CacheLock:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a+')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+# Кэш результатов на диске: ключ - хеш содержимого входного файла и пара форматов.
+# Объекты записываются во временный файл и публикуются через os.replace, поэтому другой процесс
+# никогда не видит недописанный результат. Служебное состояние (статистика и общий размер)
+# изменяется только под файловой блокировкой. Давность использования - время изменения объекта,
+# которое обновляется при каждом попадании.
+class ResultCache:
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE, link=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.link = link
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.state_file = os.path.join(directory, 'state.json')
+        self.lock_file = os.path.join(directory, 'lock')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def key_for(self, input_file, input_format, output_format):
+        return hashlib.sha256(
+            f"{CACHE_VERSION}:{input_format}:{output_format}:{hash_file(input_file)}".encode('ascii')).hexdigest()
+
+    def object_path(self, key):
+        return os.path.join(self.objects_dir, key[:2], key)
+
+    def read_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'size': None}
+
+    def write_state(self, state):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.state_file)
+
+    def update_state(self, **deltas):
+        with CacheLock(self.lock_file):
+            state = self.read_state()
+            for name, delta in deltas.items():
+                state[name] = (state[name] or 0) + delta
+            self.write_state(state)
+
+    # Копирует (или связывает) сохранённый результат в output_file; возвращает False при промахе
+    def fetch(self, key, output_file):
+        path = self.object_path(key)
+        try:
+            os.utime(path)
+            self.materialize(path, output_file)
+        except FileNotFoundError:
+            # Объекта нет или его только что вытеснил другой процесс
+            self.update_state(misses=1)
+            return False
+        self.update_state(hits=1)
+        return True
+
+    def materialize(self, path, output_file):
+        if self.link:
+            try:
+                if os.path.lexists(output_file):
+                    os.remove(output_file)
+                os.link(path, output_file)
+                return
+            except FileNotFoundError:
+                raise
+            except OSError:
+                # Другая файловая система или ссылки не поддерживаются
+                pass
+        directory = os.path.dirname(os.path.abspath(output_file))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as target, open(path, 'rb') as source:
+                shutil.copyfileobj(source, target, HASH_CHUNK_SIZE)
+            os.replace(temp_path, output_file)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def store(self, key, output_file):
+        path = self.object_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as target, open(output_file, 'rb') as source:
+                shutil.copyfileobj(source, target, HASH_CHUNK_SIZE)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        size = os.path.getsize(temp_path)
+        with CacheLock(self.lock_file):
+            state = self.read_state()
+            if state['size'] is None:
+                state['size'] = self.scan_size()
+            try:
+                state['size'] -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+            state['size'] += size
+            state['stores'] += 1
+            if state['size'] > self.max_size:
+                self.evict(state)
+            self.write_state(state)
+
+    def entries(self):
+        for directory, _, file_names in os.walk(self.objects_dir):
+            for file_name in file_names:
+                if not file_name.endswith('.tmp'):
+                    path = os.path.join(directory, file_name)
+                    try:
+                        yield path, os.stat(path)
+                    except FileNotFoundError:
+                        pass
+
+    def scan_size(self):
+        return sum(stat.st_size for _, stat in self.entries())
+
+    # Вызывается под блокировкой: удаляет давно не использованные объекты, пока размер превышает предел
+    def evict(self, state):
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        state['size'] = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if state['size'] <= self.max_size:
+                break
+            os.remove(path)
+            state['size'] -= stat.st_size
+            state['evictions'] += 1
+
+    def stats(self):
+        with CacheLock(self.lock_file):
+            state = self.read_state()
+        if state['size'] is None:
+            state['size'] = self.scan_size()
+        lookups = state['hits'] + state['misses']
+        state['hit_rate'] = state['hits'] / lookups if lookups else 0.0
+        return state
+
+    def clear(self):
+        with CacheLock(self.lock_file):
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+            os.makedirs(self.objects_dir, exist_ok=True)
+            self.write_state({'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'size': 0})
@@ -0,0 +1,61 @@
+import json
+from itertools import islice
+
+
+# Результаты накапливаются пачками и записываются одним вызовом, в памяти не больше одной пачки
+WRITE_BATCH = 1024
+
+# Отступы обрабатывает только медленный кодировщик на Python, а скалярам они не нужны
+SCALAR_ENCODER = json.JSONEncoder(ensure_ascii=False)
+INDENT_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+XML_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
+def batches(results):
+    results = iter(results)
+    while True:
+        batch = list(islice(results, WRITE_BATCH))
+        if not batch:
+            return
+        yield batch
+
+
+# Вывод совпадает с тем, что давало дерево ElementTree с корнем <calculations>, но элементы
+# пишутся по мере поступления результатов
+def write_xml(results, file):
+    file.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+    empty = True
+    for batch in batches(results):
+        if empty:
+            file.write(b'<calculations>')
+            empty = False
+        file.write(''.join(f'<calculation><expression>{str(result).translate(XML_ESCAPES)}</expression></calculation>'
+                           for result in batch).encode('utf-8'))
+    file.write(b'<calculations />' if empty else b'</calculations>')
+
+
+# Массив в том же виде, что json.dump(..., indent=2): каждый элемент на своей строке
+def write_json_array(results, file):
+    empty = True
+    for batch in batches(results):
+        pieces = []
+        for result in batch:
+            if isinstance(result, (dict, list)):
+                item = INDENT_ENCODER.encode(result).replace('\n', '\n  ')
+            else:
+                item = SCALAR_ENCODER.encode(result)
+            pieces.append(('[\n  ' if empty else ',\n  ') + item)
+            empty = False
+        file.write(''.join(pieces))
+    file.write('[]' if empty else '\n]')
+
+
+# Последовательность верхнего уровня в блочном стиле: выгрузки соседних пачек просто идут подряд
+def write_yaml_sequence(results, file, yaml, dumper):
+    empty = True
+    for batch in batches(results):
+        yaml.dump(batch, file, Dumper=dumper, allow_unicode=True, sort_keys=False)
+        empty = False
+    if empty:
+        file.write('[]\n')
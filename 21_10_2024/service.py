@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import http.client
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from arithmetic_processor import FORMAT_EXTENSIONS, INPUT_FORMATS, ArithmeticProcessor
+from metrics import Metrics
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_BODY = 64 << 20
+
+CONTENT_TYPES = {
+    'json': 'application/json; charset=utf-8',
+    'yaml': 'application/yaml; charset=utf-8',
+    'xml': 'application/xml; charset=utf-8',
+    'html': 'text/html; charset=utf-8',
+    'text': 'text/plain; charset=utf-8',
+    'protobuf': 'application/x-protobuf',
+    'npy': 'application/octet-stream',
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Выполняется в пуле обработчиков; в процессе-обработчике модули уже загружены, запуск интерпретатора не нужен
+def process_request(input_format, output_format, bulk, data):
+    return ArithmeticProcessor(None, None, input_format, output_format, bulk).process_data(data)
+
+
+# Локальный сервис обработки по HTTP/1.1 на localhost или Unix-сокете:
+#   POST /process?input=json&output=xml[&bulk=1] - тело запроса обрабатывается, в ответе результат;
+#   GET /metrics - метрики в формате Prometheus; GET /health - проверка готовности.
+# Обработка идёт в пуле из workers процессов (или потоков). Запросов, ожидающих свободного обработчика,
+# не больше max_pending, лишние сразу получают 503. timeout ограничивает ожидание и обработку запроса.
+class ProcessingService:
+    def __init__(self, workers=None, threads=False, max_pending=None, timeout=DEFAULT_TIMEOUT,
+                 max_body=DEFAULT_MAX_BODY, metrics=None):
+        self.workers = max(1, workers or os.cpu_count())
+        self.threads = threads
+        self.max_pending = self.workers * 4 if max_pending is None else max_pending
+        self.timeout = timeout
+        self.max_body = max_body
+        self.metrics = metrics or Metrics()
+        self.executor = None
+        self.slots = None
+        self.waiting = 0
+        self.active = 0
+        self.server = None
+        # Обработчики открытых соединений и те из них, что ждут следующего запроса
+        self.connections = {}
+        self.idle = set()
+        self.closing = False
+
+    def start_executor(self):
+        if self.threads:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if self.executor is None:
+            self.start_executor()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.update_gauges()
+        if unix_path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        # Соединения, ждущие следующего запроса, закрываются сразу; остальные закроются после ответа
+        self.closing = True
+        for task in self.idle:
+            self.connections[task].close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.executor is not None:
+            # Задачи из очереди пула отменяются; уже выполняющиеся процессы-обработчики
+            # доделают перед выходом интерпретатора, даже если срок ответа по ним истёк
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def update_gauges(self):
+        self.metrics.set('requests_in_flight', self.active)
+        self.metrics.set('requests_waiting', self.waiting)
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while not self.closing:
+                self.idle.add(task)
+                try:
+                    # Соединение без запросов дольше timeout закрывается
+                    request = await asyncio.wait_for(self.read_head(reader), self.timeout)
+                    if request is not None:
+                        request = await asyncio.wait_for(self.read_body(reader, writer, *request), self.timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    await self.respond(writer, e.status, str(e).encode('utf-8'), close=True)
+                    break
+                finally:
+                    self.idle.discard(task)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, content_type, payload = await self.dispatch(method, target, body)
+                close = self.closing or headers.get('connection', '').lower() == 'close'
+                await self.respond(writer, status, payload, content_type, close)
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.idle.discard(task)
+            del self.connections[task]
+            writer.close()
+
+    async def read_head(self, reader):
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+            parts = line.decode('latin-1').split()
+            if len(parts) != 3:
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректная строка запроса")
+            method, target, _ = parts
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Слишком длинный заголовок запроса")
+        return method, target, headers
+
+    async def read_body(self, reader, writer, method, target, headers):
+        # Тело читается только по Content-Length. Без этой проверки chunked-тело считалось бы пустым,
+        # а его байты - следующим запросом; ответ HttpError закрывает соединение
+        if 'transfer-encoding' in headers:
+            raise HttpError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding не поддерживается, нужен Content-Length")
+        # Только десятичные цифры: int() принял бы и '-5', '+5', '1_000'
+        length = headers.get('content-length', '0')
+        if not (length.isascii() and length.isdigit()):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Некорректный Content-Length")
+        length = int(length)
+        if length > self.max_body:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Тело запроса больше {self.max_body} байт")
+        if headers.get('expect', '').lower() == '100-continue':
+            # curl и другие клиенты ждут этого ответа, прежде чем отправить большое тело
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            await writer.drain()
+        body = await reader.readexactly(length) if length else b''
+        return method, target, headers, body
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/health' and method == 'GET':
+            return HTTPStatus.OK, CONTENT_TYPES['text'], b'ok\n'
+        if url.path == '/metrics' and method == 'GET':
+            return HTTPStatus.OK, 'text/plain; version=0.0.4', self.metrics.to_prometheus().encode('utf-8')
+        if url.path != '/process':
+            return HTTPStatus.NOT_FOUND, CONTENT_TYPES['text'], "Неизвестный адрес\n".encode('utf-8')
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, CONTENT_TYPES['text'], "Нужен метод POST\n".encode('utf-8')
+
+        self.metrics.add('requests')
+        self.metrics.add('bytes_in', len(body))
+        with self.metrics.stage('request'):
+            try:
+                input_format, output_format, bulk = self.parse_query(url.query)
+                result = await self.process(input_format, output_format, bulk, body)
+            except HttpError as e:
+                self.metrics.add(f'responses_{e.status.value}')
+                return e.status, CONTENT_TYPES['text'], f"{e}\n".encode('utf-8')
+        self.metrics.add('responses_200')
+        self.metrics.add('bytes_out', len(result))
+        return HTTPStatus.OK, CONTENT_TYPES[output_format], result
+
+    @staticmethod
+    def parse_query(query):
+        parameters = {name: values[-1] for name, values in parse_qs(query).items()}
+        input_format = parameters.get('input', 'text')
+        output_format = parameters.get('output', input_format)
+        if input_format not in INPUT_FORMATS.values():
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Неизвестный входной формат: {input_format}")
+        if output_format not in FORMAT_EXTENSIONS:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Неизвестный выходной формат: {output_format}")
+        return input_format, output_format, parameters.get('bulk') in ('1', 'true')
+
+    async def process(self, input_format, output_format, bulk, data):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        if self.waiting >= self.max_pending:
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "Очередь обработки заполнена, повторите запрос позже")
+
+        self.waiting += 1
+        self.update_gauges()
+        try:
+            with self.metrics.stage('queue'):
+                await asyncio.wait_for(self.slots.acquire(), deadline - loop.time())
+        except asyncio.TimeoutError:
+            self.metrics.add('timeouts')
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "Истекло время ожидания свободного обработчика")
+        finally:
+            self.waiting -= 1
+            self.update_gauges()
+
+        future = loop.run_in_executor(self.executor, process_request, input_format, output_format, bulk, data)
+        self.active += 1
+        self.update_gauges()
+
+        # Место освобождается, когда задача действительно завершилась в пуле, а не когда истёк срок ответа:
+        # иначе после тайм-аутов в пуле скопились бы задачи сверх числа обработчиков
+        def done(_):
+            self.active -= 1
+            self.slots.release()
+            self.update_gauges()
+
+        future.add_done_callback(done)
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline - loop.time())
+        except asyncio.TimeoutError:
+            self.metrics.add('timeouts')
+            raise HttpError(HTTPStatus.GATEWAY_TIMEOUT, f"Обработка не уложилась в {self.timeout} с")
+        except ValueError as e:
+            self.metrics.add('processing_errors')
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        except Exception as e:
+            # Например, ошибка разбора YAML или аварийно завершившийся процесс-обработчик
+            self.metrics.add('processing_errors')
+            raise HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Ошибка обработки: {e}")
+        finally:
+            self.metrics.add_time('process', time.perf_counter() - started)
+
+    @staticmethod
+    async def respond(writer, status, payload, content_type=CONTENT_TYPES['text'], close=False):
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, unix_path, timeout=DEFAULT_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = unix_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+# Клиент для вызывающих сервисов и проверок: возвращает результат или выбрасывает ValueError
+# с сообщением сервиса. connection можно передавать повторно, соединение держится открытым.
+def process_remote(data, input_format, output_format, bulk=False, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                   unix_path=None, timeout=DEFAULT_TIMEOUT, connection=None):
+    if connection is None:
+        if unix_path is not None:
+            connection = UnixHTTPConnection(unix_path, timeout)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    query = {'input': input_format, 'output': output_format}
+    if bulk:
+        query['bulk'] = '1'
+    connection.request('POST', '/process?' + urlencode(query), body=data)
+    response = connection.getresponse()
+    payload = response.read()
+    if response.status != HTTPStatus.OK:
+        raise ValueError(f"Сервис ответил {response.status}: {payload.decode('utf-8', 'replace').strip()}")
+    return payload
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m service",
+        description="Локальный сервис обработки: модули загружаются один раз, файлы передаются по HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"адрес (по умолчанию {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"порт (по умолчанию {DEFAULT_PORT})")
+    parser.add_argument("--unix", help="слушать Unix-сокет вместо TCP")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="число обработчиков (по умолчанию число ядер)")
+    parser.add_argument("--threads", action="store_true", help="обрабатывать в потоках вместо процессов")
+    parser.add_argument("--max-pending", type=int, help="сколько запросов может ждать обработчика (по умолчанию 4 на обработчик)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="предельное время запроса в секундах")
+    parser.add_argument("--max-body-mb", type=float, default=DEFAULT_MAX_BODY / (1 << 20),
+                        help="наибольший размер тела запроса в МБ")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    service = ProcessingService(args.workers, args.threads, args.max_pending, args.timeout,
+                                int(args.max_body_mb * (1 << 20)))
+    await service.start(args.host, args.port, args.unix)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop.set)
+    address = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Сервис слушает {address}, обработчиков: {service.workers}", flush=True)
+    try:
+        await stop.wait()
+    finally:
+        await service.close()
+        if args.unix:
+            os.unlink(args.unix)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except OSError as e:
+        print(f"ОШИБКА: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arithmetic_processor import ArithmeticProcessor
+
+
+# Обработка файла в него же: выходной файл не должен усекаться до чтения входного
+@pytest.mark.parametrize('input_format, source, expected', [
+    ('text', "3 + 4\n6 * 7\n", "7\n42\n"),
+    ('html', "<p>3 + 4</p><p>6 * 7</p>", "<p>7</p><p>42</p>"),
+])
+def test_process_onto_itself(tmp_path, input_format, source, expected):
+    path = str(tmp_path / f"input.{'txt' if input_format == 'text' else input_format}")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+    ArithmeticProcessor(path, path, input_format, input_format).run()
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == expected
+
+
+def test_process_json_onto_itself(tmp_path):
+    path = str(tmp_path / "input.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"expressions": ["3 + 4", "6 * 7"]}, f)
+    ArithmeticProcessor(path, path, 'json', 'json').run()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"expressions": ["7", "42"]}
+
+
+# Ошибка посередине не должна оставлять недописанный результат и временные файлы
+def test_failed_run_keeps_output(tmp_path):
+    input_file = str(tmp_path / "input.txt")
+    output_file = str(tmp_path / "output.txt")
+    with open(input_file, 'w', encoding='utf-8') as f:
+        f.write("3 + 4\n1 / 0\n")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("прежний результат")
+    with pytest.raises(ValueError):
+        ArithmeticProcessor(input_file, output_file, 'text', 'text').run()
+    with open(output_file, encoding='utf-8') as f:
+        assert f.read() == "прежний результат"
+    assert sorted(os.listdir(tmp_path)) == ["input.txt", "output.txt"]
+
+
+# Жёсткая ссылка пользователя на выходной файл сохраняется и видит новый результат
+def test_user_hard_link_is_kept(tmp_path):
+    input_file = str(tmp_path / "input.txt")
+    output_file = str(tmp_path / "output.txt")
+    linked_file = str(tmp_path / "linked.txt")
+    with open(input_file, 'w', encoding='utf-8') as f:
+        f.write("3 + 4\n")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("прежний результат")
+    os.link(output_file, linked_file)
+    ArithmeticProcessor(input_file, output_file, 'text', 'text').run()
+    assert os.path.samefile(output_file, linked_file)
+    with open(linked_file, encoding='utf-8') as f:
+        assert f.read() == "7\n"
+
+
+# Выходной файл, связанный с объектом кэша, заменяется, а сохранённый результат не меняется
+def test_cache_link_is_replaced(tmp_path):
+    from result_cache import ResultCache
+    cache = ResultCache(str(tmp_path / "cache"), link=True)
+    input_file = str(tmp_path / "input.txt")
+    output_file = str(tmp_path / "output.txt")
+    with open(input_file, 'w', encoding='utf-8') as f:
+        f.write("3 + 4\n")
+    cached = cache.object_path(cache.key_for(input_file, 'text', 'text'))
+    # Второй запуск берёт результат из кэша, выходной файл становится ссылкой на объект
+    for _ in range(2):
+        ArithmeticProcessor(input_file, output_file, 'text', 'text', cache=cache).run()
+    assert os.path.samefile(output_file, cached)
+
+    with open(input_file, 'w', encoding='utf-8') as f:
+        f.write("6 * 7\n")
+    ArithmeticProcessor(input_file, output_file, 'text', 'text', cache=cache).run()
+    with open(output_file, encoding='utf-8') as f:
+        assert f.read() == "42\n"
+    with open(cached, encoding='utf-8') as f:
+        assert f.read() == "7\n"
@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_processor import main
+
+
+# Выходной каталог совпадает с входным: файлы не должны перезаписываться результатами
+def test_output_dir_with_inputs_is_rejected(tmp_path, capsys):
+    input_file = tmp_path / "input.txt"
+    input_file.write_text("3 + 4\n", encoding='utf-8')
+    assert main([str(tmp_path), '-o', str(tmp_path), '-j', '1']) == 2
+    assert "совпадает с входным" in capsys.readouterr().err
+    assert input_file.read_text(encoding='utf-8') == "3 + 4\n"
@@ -0,0 +1,36 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service import ProcessingService
+
+
+# Отправляет запрос как есть и возвращает строку статуса ответа
+async def send_raw(request, tmp_path):
+    service = ProcessingService(workers=1, threads=True, timeout=5)
+    unix_path = str(tmp_path / "service.sock")
+    await service.start(unix_path=unix_path)
+    try:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+        writer.write(request)
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+        return status.decode('latin-1').strip()
+    finally:
+        await service.close()
+
+
+@pytest.mark.parametrize('length', ['-5', 'abc', '+5'])
+def test_invalid_content_length(tmp_path, length):
+    request = (f"POST /process HTTP/1.1\r\nContent-Length: {length}\r\n\r\n3 + 4").encode('latin-1')
+    assert asyncio.run(send_raw(request, tmp_path)) == "HTTP/1.1 400 Bad Request"
+
+
+def test_valid_content_length(tmp_path):
+    request = b"POST /process HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\n3 + 4"
+    assert asyncio.run(send_raw(request, tmp_path)) == "HTTP/1.1 200 OK"
@@ -0,0 +1,144 @@
+import mmap
+import os
+import re
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+EXPRESSION_PATTERN = re.compile(r'\d+\s*[\+\-\*\/]\s*\d+')
+
+# Конец буфера, который может оказаться началом выражения из следующего фрагмента
+TAIL_PATTERN = re.compile(r'\d+\s*(?:[\+\-\*\/]\s*\d*)?$')
+
+
+# Возвращает обработанную часть буфера и остаток, который нужно дополнить следующим фрагментом
+def rewrite_buffer(buffer, evaluate, final=False):
+    matches = list(EXPRESSION_PATTERN.finditer(buffer))
+
+    cut = len(buffer)
+    if not final:
+        tail = TAIL_PATTERN.search(buffer, matches[-1].start() if matches else 0)
+        if tail:
+            cut = tail.start()
+
+    pieces = []
+    last = 0
+    for match in matches:
+        start, end = match.span()
+        if end > cut:
+            if start < cut:
+                cut = start
+            break
+        pieces.append(buffer[last:start])
+        pieces.append(str(evaluate(match.group(0))))
+        last = end
+    pieces.append(buffer[last:cut])
+    return ''.join(pieces), buffer[cut:]
+
+
+def rewrite_stream(source, target, evaluate, chunk_size=DEFAULT_CHUNK_SIZE, rewrite=rewrite_buffer):
+    rest = ''
+    while True:
+        chunk = source.read(chunk_size)
+        processed, rest = rewrite(rest + chunk, evaluate, final=not chunk)
+        target.write(processed)
+        if not chunk:
+            break
+
+
+# Байтовый аналог EXPRESSION_PATTERN для ASCII-совместимого UTF-8. Класс пробелов задан явно:
+# в байтовых шаблонах \s не включает \x1c-\x1f, которые \s в строковых шаблонах находит.
+ASCII_SPACE = rb'[\t-\r\x1c-\x1f ]'
+BYTES_EXPRESSION_PATTERN = re.compile(rb'[0-9]+' + ASCII_SPACE + rb'*[\+\-\*\/]' + ASCII_SPACE + rb'*[0-9]+')
+# Число фрагментов в одном системном вызове записи (не больше IOV_MAX)
+WRITE_BATCH = 1024
+# Результаты повторяющихся выражений хранятся уже закодированными; словарь очищается при переполнении
+RESULT_CACHE_SIZE = 1 << 16
+
+
+# Символы вне ASCII, которые \d и \s находят в строке; все они меньше U+20000
+def unicode_class(predicate):
+    groups = {}
+    for code in range(0x80, 0x20000):
+        if predicate(chr(code)):
+            encoded = chr(code).encode('utf-8')
+            groups.setdefault(encoded[:-1], []).append(encoded[-1])
+    # Символы с общим началом кодировки собираются в один класс по последнему байту
+    return b'|'.join(re.escape(prefix) + b'[' + b''.join(re.escape(bytes([last])) for last in lasts) + b']'
+                     for prefix, lasts in groups.items())
+
+
+_unicode_patterns = None
+
+
+def unicode_patterns():
+    global _unicode_patterns
+    if _unicode_patterns is None:
+        digits = unicode_class(str.isdecimal)
+        spaces = unicode_class(str.isspace)
+        digit = rb'(?:[0-9]|' + digits + rb')'
+        space = rb'(?:' + ASCII_SPACE + rb'|' + spaces + rb')'
+        _unicode_patterns = (
+            re.compile(digits + rb'|' + spaces),
+            re.compile(digit + rb'+' + space + rb'*[\+\-\*\/]' + space + rb'*' + digit + rb'+'),
+        )
+    return _unicode_patterns
+
+
+# Пишет фрагменты одним вызовом writev прямо из их буферов, без промежуточного копирования
+def write_pieces(target, pieces):
+    if not hasattr(os, 'writev'):
+        target.writelines(pieces)
+        return
+    written = os.writev(target.fileno(), pieces)
+    total = sum(map(len, pieces))
+    # Запись могла оказаться частичной: остаток дописывается обычным образом
+    for piece in pieces:
+        if written >= total:
+            break
+        if written >= len(piece):
+            written -= len(piece)
+            total -= len(piece)
+            continue
+        target.write(piece[written:])
+        total -= len(piece)
+        written = 0
+
+
+# Обрабатывает файл через mmap без декодирования: неизменённые участки пишутся прямо из отображения
+# через memoryview, новые объекты создаются только для результатов вычислений. Если в файле есть
+# цифры или пробелы вне ASCII, используется шаблон, который находит и их, как EXPRESSION_PATTERN.
+def rewrite_mapped(input_file, output_file, evaluate):
+    with open(input_file, 'rb') as source, open(output_file, 'wb', buffering=0) as target:
+        # Пустой файл нельзя отобразить в память
+        if os.fstat(source.fileno()).st_size == 0:
+            return
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            special, unicode_pattern = unicode_patterns()
+            pattern = unicode_pattern if special.search(mapped) else BYTES_EXPRESSION_PATTERN
+            view = memoryview(mapped)
+            matches = pattern.finditer(mapped)
+            pieces = []
+            results = {}
+            last = 0
+            try:
+                for match in matches:
+                    start, end = match.span()
+                    expression = match.group(0)
+                    result = results.get(expression)
+                    if result is None:
+                        if len(results) >= RESULT_CACHE_SIZE:
+                            results.clear()
+                        result = results[expression] = str(evaluate(expression.decode('utf-8'))).encode('utf-8')
+                    pieces.append(view[last:start])
+                    pieces.append(result)
+                    last = end
+                    if len(pieces) >= WRITE_BATCH:
+                        write_pieces(target, pieces)
+                        pieces.clear()
+                pieces.append(view[last:])
+                write_pieces(target, pieces)
+            finally:
+                # Срезы и итератор совпадений удерживают буфер отображения, без этого mmap не закрыть
+                del matches, pieces
+                view.release()
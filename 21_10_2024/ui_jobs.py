@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from progress import Cancelled
+
+
+class JobSignals(QObject):
+    started = pyqtSignal()
+    # Этап, обработано байт, всего байт; object вместо int, чтобы не упираться в 32 бита
+    progress = pyqtSignal(str, object, object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+# Фоновая задача: function(job) выполняется в пуле потоков и сообщает о ходе работы через job.stage
+# и job.report. Отмена проверяется при каждом отчёте о прогрессе, то есть на каждом прочитанном фрагменте.
+class Job(QRunnable):
+    REPORT_INTERVAL = 0.1
+
+    def __init__(self, title, function):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.title = title
+        self.function = function
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        self.running = False
+        self.stage_name = ''
+        self.total = 0
+        self.reported = 0.0
+        self.outputs = []
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    def stage(self, name, total):
+        self.check()
+        self.stage_name = name
+        self.total = total
+        self.reported = time.monotonic()
+        self.signals.progress.emit(name, 0, total)
+
+    def report(self, done):
+        self.check()
+        now = time.monotonic()
+        if now - self.reported >= self.REPORT_INTERVAL or done >= self.total:
+            self.reported = now
+            self.signals.progress.emit(self.stage_name, done, self.total)
+
+    # Файлы, которые задача создаёт; при отмене недописанные файлы удаляются
+    def output(self, path):
+        self.outputs.append(path)
+        return path
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self.signals.cancelled.emit()
+            return
+        self.running = True
+        self.signals.started.emit()
+        try:
+            result = self.function(self)
+        except Cancelled:
+            for path in self.outputs:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+# Задачи выполняются по одной в порядке добавления: следующая часто работает с результатом предыдущей
+class JobQueue(QObject):
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.jobs = []
+
+    def submit(self, job):
+        self.jobs.append(job)
+        job.signals.started.connect(self.changed)
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *_, job=job: self.remove(job))
+        self.pool.start(job)
+        self.changed.emit()
+
+    def remove(self, job):
+        if job in self.jobs:
+            self.jobs.remove(job)
+            self.changed.emit()
+
+    def cancel(self, job):
+        job.cancel()
+        # Задача, которая ещё ждёт в очереди, снимается сразу
+        if self.pool.tryTake(job):
+            self.remove(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            self.cancel(job)
+
+    def wait(self):
+        self.pool.waitForDone()
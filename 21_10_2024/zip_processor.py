@@ -0,0 +1,169 @@
+import argparse
+import os
+import posixpath
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from arithmetic_processor import FORMAT_EXTENSIONS, ArithmeticProcessor, detect_input_format
+from batch_processor import output_path
+
+
+# Архив открывается в каждом процессе-обработчике один раз, при запуске
+_archive = None
+
+
+def open_archive(archive_file):
+    global _archive
+    _archive = zipfile.ZipFile(archive_file, 'r')
+
+
+# Имя элемента без абсолютных путей и '..', чтобы результат не оказался вне выходного каталога
+def member_path(name):
+    parts = [part for part in posixpath.normpath(name.replace('\\', '/')).split('/') if part not in ('', '.', '..')]
+    if not parts:
+        raise ValueError(f"Недопустимое имя элемента архива: {name!r}")
+    return os.path.join(*parts)
+
+
+# Выходные файлы элементов назначаются заранее, в порядке архива. Разные элементы могут дать один путь
+# (x и x.txt, повторяющиеся имена, имена с '..'); тогда к пути следующего добавляется -2, -3, ...
+# перед расширением. Для недопустимых имён возвращается None, ошибку выдаст process_member.
+def plan_outputs(names, output_dir, output_format):
+    extension = FORMAT_EXTENSIONS[output_format]
+    used = set()
+    outputs = []
+    for name in names:
+        try:
+            output_file = output_path(output_dir, member_path(name), output_format)
+        except ValueError:
+            outputs.append(None)
+            continue
+        stem = output_file[:-len(extension)]
+        number = 1
+        while os.path.normcase(output_file) in used:
+            number += 1
+            output_file = f"{stem}-{number}{extension}"
+        used.add(os.path.normcase(output_file))
+        outputs.append(output_file)
+    return outputs
+
+
+# Элемент читается прямо из архива в память и обрабатывается без распаковки на диск.
+# Если write, результат пишется в output_file, иначе возвращается вызывающему.
+# Элементы без известного расширения обрабатываются как текст.
+def process_member(task):
+    info, output_format, write, output_file, bulk = task
+    name = info.filename
+    bytes_in = 0
+    try:
+        if write and output_file is None:
+            member_path(name)
+        # По ZipInfo, а не по имени: при повторяющихся именах read(name) вернул бы последний элемент
+        data = _archive.read(info)
+        bytes_in = len(data)
+        processor = ArithmeticProcessor(None, None, detect_input_format(name) or 'text', output_format, bulk)
+        result = processor.process_data(data)
+        if write:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            with open(output_file, 'wb') as file:
+                file.write(result)
+            result = len(result)
+    except Exception as e:
+        return name, bytes_in, None, str(e)
+    return name, bytes_in, result, None
+
+
+def archive_members(archive_file):
+    with zipfile.ZipFile(archive_file, 'r') as archive:
+        return [info for info in archive.infolist() if not info.is_dir()]
+
+
+# Обрабатывает элементы архива в пуле процессов. Если output_dir задан, каждый элемент пишется в свой
+# файл; иначе результаты в порядке элементов архива записываются подряд в output_file, каждый с новой строки.
+# progress получает число байт обработанных элементов (без сжатия) и может прервать работу.
+# Возвращает список (имя, байт на входе, байт на выходе, ошибка) в порядке элементов архива.
+def process_archive(archive_file, output_file=None, output_dir=None, output_format='text', bulk=False,
+                    workers=None, progress=None, mp_context=None):
+    if (output_file is None) == (output_dir is None):
+        raise ValueError("Нужно указать либо выходной файл, либо выходной каталог")
+    if output_file is not None and output_format not in ('text', 'html'):
+        raise ValueError("Результаты всех элементов в одном файле поддерживаются только для форматов text и html")
+    members = archive_members(archive_file)
+    workers = max(1, workers or os.cpu_count())
+    chunksize = max(1, min(64, len(members) // (workers * 4)))
+    names = [info.filename for info in members]
+    if output_dir is not None:
+        tasks = [(info, output_format, True, output_file, bulk)
+                 for info, output_file in zip(members, plan_outputs(names, output_dir, output_format))]
+    else:
+        tasks = [(info, output_format, False, None, bulk) for info in members]
+
+    results = []
+    done = 0
+    target = open(output_file, 'wb') if output_file is not None else None
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                   initializer=open_archive, initargs=(archive_file,))
+    try:
+        for name, bytes_in, result, error in executor.map(process_member, tasks, chunksize=chunksize):
+            if target is not None and error is None:
+                if result and not result.endswith(b'\n'):
+                    result += b'\n'
+                target.write(result)
+                result = len(result)
+            results.append((name, bytes_in, result, error))
+            done += bytes_in
+            if progress is not None:
+                progress(done)
+    except BaseException:
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        if target is not None:
+            target.close()
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m zip_processor",
+        description="Обработка элементов zip-архива в нескольких процессах без распаковки на диск.")
+    parser.add_argument("archive", help="zip-архив с входными файлами")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output", help="один выходной файл с результатами в порядке элементов архива")
+    output.add_argument("-d", "--output-dir", help="каталог, в который результат каждого элемента пишется отдельно")
+    parser.add_argument("-f", "--output-format", default="text", choices=sorted(FORMAT_EXTENSIONS),
+                        help="формат результатов (по умолчанию text)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="число процессов-обработчиков (по умолчанию число ядер)")
+    parser.add_argument("--bulk", action="store_true", help="вычислять выражения пакетно через numpy")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    try:
+        results = process_archive(args.archive, args.output, args.output_dir, args.output_format, args.bulk,
+                                  args.workers)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"ОШИБКА {args.archive}: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for name, _, _, error in results:
+        if error is not None:
+            failed += 1
+            print(f"ОШИБКА {name}: {error}", file=sys.stderr)
+    total_in = sum(bytes_in for _, bytes_in, _, _ in results)
+    total_out = sum(bytes_out or 0 for _, _, bytes_out, _ in results)
+    print(f"Элементов: {len(results)}, с ошибками: {failed}, "
+          f"прочитано {total_in / 1e6:.2f} МБ, записано {total_out / 1e6:.2f} МБ за {elapsed:.2f} с ({total_in / 1e6 / elapsed:.2f} МБ/с)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import nums
+
+
+LOADERS = {
+    'список списков': nums.read_graph,
+    'CSR (array)': nums.read_graph_csr,
+}
+
+
+def make_graph_file(file_name, n, degree, seed=0):
+    rng = random.Random(seed)
+    with open(file_name, 'w') as f:
+        f.write(f"{n}\n")
+        for u in range(n):
+            # Ребро u -> u + 1 делает финиш достижимым, остальные рёбра случайные
+            targets = [rng.randrange(n) for _ in range(rng.randint(0, 2 * degree))]
+            if u + 1 < n:
+                targets.append(u + 1)
+            f.write(' '.join(map(str, targets)) + ' -2\n')
+
+
+def current_rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+# Замер в отдельном процессе, чтобы пик памяти одного загрузчика не влиял на другой
+def run_child(loader, file_name):
+    before = current_rss()
+    started = time.perf_counter()
+    n, graph = LOADERS[loader](file_name)
+    load_seconds = time.perf_counter() - started
+    retained = current_rss() - before
+
+    started = time.perf_counter()
+    nums.find_inevitable_points(n, graph)
+    reach_seconds = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(load_seconds, reach_seconds, retained, peak_rss)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(*sys.argv[2:])
+        return
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'graph.txt')
+        make_graph_file(file_name, n, degree)
+        print(f"{n} вершин, файл {os.path.getsize(file_name) / 1e6:.1f} МБ")
+        for loader in LOADERS:
+            completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', loader, file_name],
+                                       capture_output=True, text=True, check=True)
+            load_seconds, reach_seconds, retained, peak_rss = map(float, completed.stdout.split())
+            print(f"    {loader:<16} загрузка {load_seconds:6.2f} с  граф {retained / 1e6:7.1f} МБ  "
+                  f"пик памяти {peak_rss / 1e6:7.1f} МБ  достижимость {reach_seconds:6.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import individual_binary_tree as tree_module
+
+
+def measure(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+# Прежний способ: после каждого удаления размеры поддеревьев пересчитываются обходом всего дерева
+def legacy_rounds(keys, rounds):
+    root = None
+    for key in keys:
+        root = tree_module.insert(root, key)
+    for _ in range(rounds):
+        tree_module.update_child_count(root)
+        node = tree_module.find_node_with_max_diff(root)
+        if node is None:
+            break
+        root = tree_module.delete_node(root, node.val)
+    return root
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    # Прежнее дерево несбалансированное, поэтому сравнение идёт на меньшем числе ключей
+    legacy_n = min(n, 20_000)
+
+    rng = random.Random(0)
+    keys = rng.sample(range(10 * n), n)
+
+    tree, build_seconds = measure(tree_module.AvlTree.from_keys, keys)
+    print(f"{n} ключей: построение {build_seconds:6.2f} с, высота {tree.root.height}")
+
+    _, rounds_seconds = measure(tree.delete_max_diff, rounds)
+    print(f"    {rounds} удалений вершины с наибольшей разностью: {rounds_seconds:6.2f} с "
+          f"({rounds_seconds / rounds * 1e6:.1f} мкс на удаление)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'out.txt')
+        with open(file_name, 'w') as f:
+            _, write_seconds = measure(tree_module.write_pre_order, tree, f)
+        print(f"    запись прямого обхода: {write_seconds:6.2f} с, файл {os.path.getsize(file_name) / 1e6:.1f} МБ")
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(f"    пик памяти {peak_rss / 1e6:.1f} МБ")
+
+    legacy_keys = keys[:legacy_n]
+    legacy_rounds_count = min(rounds, 200)
+    _, legacy_seconds = measure(legacy_rounds, legacy_keys, legacy_rounds_count)
+    avl_seconds = measure(lambda: tree_module.AvlTree.from_keys(legacy_keys).delete_max_diff(legacy_rounds_count))[1]
+    print(f"{legacy_n} ключей, {legacy_rounds_count} удалений: прежний способ {legacy_seconds:6.2f} с, "
+          f"AVL {avl_seconds:6.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'y_and_y.py')
+
+
+def make_days_file(file_name, n, big_share=0.5, seed=0):
+    rng = random.Random(seed)
+    with open(file_name, 'w') as f:
+        f.write(f"{n}\n")
+        for start in range(0, n, 1 << 16):
+            count = min(1 << 16, n - start)
+            f.write(''.join(f"{rng.randint(101, 300) if rng.random() < big_share else rng.randint(0, 100)}\n"
+                            for _ in range(count)))
+
+
+# Худший случай для дешёвых дней: сначала копятся купоны, потом каждый дешёвый обед выгодно брать
+# бесплатно лишь начиная с далёкого числа купонов, и пороги чередуются между началом и концом
+def make_adversarial_file(file_name, n):
+    with open(file_name, 'w') as f:
+        f.write(f"{n}\n")
+        f.write("101\n" * (n // 2))
+        f.write("100\n" * (n - n // 2))
+
+
+# Полный прогон скрипта: потоковое чтение stdin, расчёт и запись ответа
+def run_script(input_name, output_name):
+    started = time.perf_counter()
+    with open(input_name, 'rb') as source, open(output_name, 'wb') as target:
+        subprocess.run([sys.executable, SCRIPT], stdin=source, stdout=target, check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    sizes = [int(float(arg)) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as directory:
+        input_name = os.path.join(directory, 'input.txt')
+        output_name = os.path.join(directory, 'output.txt')
+        for n in sizes:
+            for kind, make in (('случайные', make_days_file), ('худшие', make_adversarial_file)):
+                make(input_name, n)
+                seconds = run_script(input_name, output_name)
+                # Пик памяти дочерних процессов не убывает, поэтому размеры идут по возрастанию
+                peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+                with open(output_name) as f:
+                    total = f.readline().strip()
+                    left, used = f.readline().split()
+                print(f"{n:>10} дней, {kind:9}: {seconds:7.2f} с ({seconds / n * 1e6:5.2f} мкс на день), "
+                      f"пик памяти {peak_rss / 1e6:7.1f} МБ, стоимость {total}, купонов осталось {left}, "
+                      f"использовано {used}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import argparse
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+
 class TreeNode:
     def __init__(self, key):
         self.left = None
@@ -6,32 +12,51 @@ class TreeNode:
         self.child_count = 0
 
 
+# Функции исходного дерева без рекурсии: на упорядоченном входе дерево вырождается в список,
+# и рекурсия упиралась в ограничение глубины уже на нескольких тысячах ключей
 def insert(root, key):
     if root is None:
         return TreeNode(key)
-    else:
-        if key < root.val:
-            root.left = insert(root.left, key)
-        elif key > root.val:
-            root.right = insert(root.right, key)
+    node = root
+    while key != node.val:
+        if key < node.val:
+            if node.left is None:
+                node.left = TreeNode(key)
+                break
+            node = node.left
+        else:
+            if node.right is None:
+                node.right = TreeNode(key)
+                break
+            node = node.right
     return root
 
 
 def update_child_count(node):
     if node is None:
         return 0
-    node.child_count = 1 + update_child_count(node.left) + update_child_count(node.right)
+    # Вершина обрабатывается после своих поддеревьев: второй раз она снимается со стека с флагом True
+    stack = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+        if children_done:
+            current.child_count = (1 + (current.left.child_count if current.left else 0)
+                                   + (current.right.child_count if current.right else 0))
+            continue
+        stack.append((current, True))
+        if current.right:
+            stack.append((current.right, False))
+        if current.left:
+            stack.append((current.left, False))
     return node.child_count
 
 
 def find_node_with_max_diff(root):
     max_diff = -1
     target_node = None
-
-    def dfs(node):
-        nonlocal max_diff, target_node
-        if node is None:
-            return
+    stack = [root] if root else []
+    while stack:
+        node = stack.pop()
 
         left_count = node.left.child_count if node.left else 0
         right_count = node.right.child_count if node.right else 0
@@ -41,46 +66,296 @@ def find_node_with_max_diff(root):
             max_diff = diff
             target_node = node
 
-        dfs(node.left)
-        dfs(node.right)
-
-    dfs(root)
+        if node.right:
+            stack.append(node.right)
+        if node.left:
+            stack.append(node.left)
     return target_node
 
 
 def delete_node(root, key):
-    if root is None:
+    parent = None
+    node = root
+    while node is not None and node.val != key:
+        parent = node
+        node = node.left if key < node.val else node.right
+    if node is None:
         return root
-    if key < root.val:
-        root.left = delete_node(root.left, key)
-    elif key > root.val:
-        root.right = delete_node(root.right, key)
-    else:
-        if root.left is None:
-            return root.right
-        elif root.right is None:
-            return root.left
-
-        min_larger_node = root.right
-        while min_larger_node.left is not None:
-            min_larger_node = min_larger_node.left
 
-        root.val = min_larger_node.val
-        root.right = delete_node(root.right, min_larger_node.val)
+    if node.left is not None and node.right is not None:
+        # Ключ заменяется наименьшим из правого поддерева, удаляется вершина этого ключа
+        parent = node
+        successor = node.right
+        while successor.left is not None:
+            parent = successor
+            successor = successor.left
+        node.val = successor.val
+        node = successor
 
+    child = node.left if node.left is not None else node.right
+    if parent is None:
+        return child
+    if parent.left is node:
+        parent.left = child
+    else:
+        parent.right = child
     return root
 
 
 def pre_order_traversal(root, result):
-    if root:
-        result.append(root.val)
-        pre_order_traversal(root.left, result)
-        pre_order_traversal(root.right, result)
+    stack = [root] if root else []
+    while stack:
+        node = stack.pop()
+        result.append(node.val)
+        if node.right:
+            stack.append(node.right)
+        if node.left:
+            stack.append(node.left)
+
+
+# Вершина AVL-дерева. Кроме размера и высоты поддерева хранится лучшая в поддереве пара
+# (разность размеров левого и правого поддеревьев, ключ) - по ней ищется вершина с наибольшей разностью,
+# при равенстве разностей - с наибольшим ключом, как в find_node_with_max_diff.
+# Пара хранится в двух полях, а не кортежем: на миллионах вершин это заметная экономия памяти и времени.
+class AvlNode:
+    __slots__ = ('left', 'right', 'val', 'size', 'height', 'best_diff', 'best_val')
+
+    def __init__(self, key):
+        self.left = None
+        self.right = None
+        self.val = key
+        self.size = 1
+        self.height = 1
+        self.best_diff = 0
+        self.best_val = key
+
+    # Вызывается на каждой вершине пути при каждом изменении, поэтому без вызовов max и abs
+    def update(self):
+        left, right = self.left, self.right
+        if left is None:
+            left_size = left_height = 0
+        else:
+            left_size, left_height = left.size, left.height
+        if right is None:
+            right_size = right_height = 0
+        else:
+            right_size, right_height = right.size, right.height
+        self.size = 1 + left_size + right_size
+        self.height = 1 + (left_height if left_height > right_height else right_height)
+
+        diff = left_size - right_size if left_size > right_size else right_size - left_size
+        val = self.val
+        if left is not None and (left.best_diff > diff or left.best_diff == diff and left.best_val > val):
+            diff, val = left.best_diff, left.best_val
+        if right is not None and (right.best_diff > diff or right.best_diff == diff and right.best_val > val):
+            diff, val = right.best_diff, right.best_val
+        self.best_diff = diff
+        self.best_val = val
+
+
+def height(node):
+    return node.height if node else 0
+
+
+def rotate_right(node):
+    top = node.left
+    node.left = top.right
+    top.right = node
+    node.update()
+    top.update()
+    return top
+
+
+def rotate_left(node):
+    top = node.right
+    node.right = top.left
+    top.left = node
+    node.update()
+    top.update()
+    return top
+
+
+# Обновляет вершину после изменения поддерева и восстанавливает баланс; возвращает новый корень поддерева
+def rebalance(node):
+    node.update()
+    left, right = node.left, node.right
+    balance = (left.height if left else 0) - (right.height if right else 0)
+    if balance > 1:
+        if height(left.left) < height(left.right):
+            node.left = rotate_left(left)
+        return rotate_right(node)
+    if balance < -1:
+        if height(right.right) < height(right.left):
+            node.right = rotate_right(right)
+        return rotate_left(node)
+    return node
+
+
+# Идеально сбалансированное дерево из отсортированных ключей без повторов: корень - медиана,
+# поддеревья строятся так же из левой и правой половин. Глубина рекурсии - log2(n).
+def build_balanced(keys, start, end):
+    if start >= end:
+        return None
+    middle = (start + end) // 2
+    node = AvlNode(keys[middle])
+    node.left = build_balanced(keys, start, middle)
+    node.right = build_balanced(keys, middle + 1, end)
+    node.update()
+    return node
+
+
+# Сбалансированное дерево поиска с размерами поддеревьев. Вставка, удаление и поиск вершины
+# с наибольшей разностью размеров поддеревьев - без рекурсии, за O(log n); повторные ключи не добавляются.
+class AvlTree:
+    def __init__(self):
+        self.root = None
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    # Построение за O(n log n): сортировка и деление по медиане вместо n вставок с балансировкой
+    @classmethod
+    def from_keys(cls, keys):
+        keys = sorted(set(keys))
+        tree = cls()
+        tree.root = build_balanced(keys, 0, len(keys))
+        return tree
+
+    # Поднимается по пути от изменённого места к корню, обновляя и балансируя вершины
+    def fix_path(self, path):
+        child = None
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            if child is not None:
+                # child - новый корень поддерева, заменившего прежний path[i + 1]
+                if node.left is path[i + 1]:
+                    node.left = child
+                else:
+                    node.right = child
+            child = rebalance(node)
+        self.root = child
+
+    def insert(self, key):
+        if self.root is None:
+            self.root = AvlNode(key)
+            return True
+        path = []
+        node = self.root
+        while node is not None:
+            if key == node.val:
+                return False
+            path.append(node)
+            node = node.left if key < node.val else node.right
+        parent = path[-1]
+        if key < parent.val:
+            parent.left = AvlNode(key)
+        else:
+            parent.right = AvlNode(key)
+        self.fix_path(path)
+        return True
+
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node is not None and node.val != key:
+            path.append(node)
+            node = node.left if key < node.val else node.right
+        if node is None:
+            return False
+
+        if node.left is not None and node.right is not None:
+            # Ключ заменяется наименьшим из правого поддерева, удаляется вершина этого ключа
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.val = successor.val
+            node = successor
+
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self.root = child
+            return True
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        self.fix_path(path)
+        return True
+
+    # Ключ вершины с наибольшей разностью размеров поддеревьев, None для пустого дерева
+    def max_diff_key(self):
+        return self.root.best_val if self.root else None
+
+    # Удаляет вершину с наибольшей разностью rounds раз подряд, каждый раз за O(log n);
+    # возвращает удалённые ключи по порядку
+    def delete_max_diff(self, rounds=1):
+        deleted = []
+        for _ in range(rounds):
+            key = self.max_diff_key()
+            if key is None:
+                break
+            self.delete(key)
+            deleted.append(key)
+        return deleted
+
+    def pre_order(self):
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            yield node.val
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
+
+
+# Пишет ключи в прямом порядке обхода, как main, но пачками, не собирая весь список в памяти
+def write_pre_order(tree, file, batch=1 << 16):
+    values = tree.pre_order()
+    separator = ''
+    while True:
+        chunk = list(islice(values, batch))
+        if not chunk:
+            break
+        file.write(separator + '\n'.join(map(str, chunk)))
+        separator = '\n'
+
+
+def read_keys(file_name):
+    with open(file_name, 'r') as f:
+        return list(map(int, f.read().strip().split()))
+
+
+# Имя '-' вместо выходного файла - печать в stdout
+def open_output(file_name):
+    return nullcontext(sys.stdout) if file_name == '-' else open(file_name, 'w')
+
+
+# Дерево строится по медиане, а не вставками по порядку файла, поэтому его форма и найденные
+# вершины отличаются от main без --balanced
+def main_balanced(input_file, output_file, rounds):
+    tree = AvlTree.from_keys(read_keys(input_file))
+    tree.delete_max_diff(rounds)
+    with open_output(output_file) as f:
+        write_pre_order(tree, f)
+
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Удаление вершины с наибольшей разностью размеров поддеревьев.")
+    parser.add_argument('--input', default='input.txt')
+    parser.add_argument('--output', default='out.txt', help="выходной файл, '-' - stdout (по умолчанию out.txt)")
+    parser.add_argument('--balanced', action='store_true',
+                        help="сбалансированное дерево из отсортированных ключей вместо вставок по порядку")
+    parser.add_argument('--rounds', type=int, default=1, help="сколько раз удалить вершину (только с --balanced)")
+    args = parser.parse_args(argv)
+    if args.balanced:
+        main_balanced(args.input, args.output, args.rounds)
+        return
 
-def main():
-    with open('input.txt', 'r') as f:
-        keys = list(map(int, f.read().strip().split()))
+    keys = read_keys(args.input)
 
     root = None
     for key in keys:
@@ -96,7 +371,7 @@ def main():
     result = []
     pre_order_traversal(root, result)
 
-    with open('out.txt', 'w') as f:
+    with open_output(args.output) as f:
         f.write('\n'.join(map(str, result)))
 
 
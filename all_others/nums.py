@@ -1,3 +1,6 @@
+from array import array
+
+
 def read_graph(file_name):
     with open(file_name, 'r') as f:
         n = int(f.readline().strip())
@@ -11,22 +14,161 @@ def read_graph(file_name):
     return n, graph
 
 
+# Граф в формате CSR: соседи вершины i - targets[offsets[i]:offsets[i + 1]]. Числа хранятся
+# в массивах array без отдельного объекта на каждое ребро. graph[i] и len(graph) работают,
+# как у списка списков, поэтому dfs и поиск доминаторов принимают оба представления.
+class CsrGraph:
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    # Граф с обращёнными рёбрами. С numpy рёбра упорядочиваются устойчивой сортировкой без копирования
+    # массивов в объекты Python, иначе - сортировкой подсчётом на Python. Порядок предшественников
+    # в обоих случаях по возрастанию, как у списка списков.
+    def reversed(self):
+        try:
+            import numpy as np
+        except ImportError:
+            return self.reversed_counting()
+        n = len(self)
+        targets = np.frombuffer(self.targets, dtype=np.int64)
+        owners = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.frombuffer(self.offsets, dtype=np.int64)))
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=offsets[1:])
+        sources = owners[np.argsort(targets, kind='stable')]
+        return CsrGraph(array('q', offsets.tobytes()), array('q', sources.tobytes()))
+
+    def reversed_counting(self):
+        n = len(self)
+        offsets = array('q', bytes(8 * (n + 1)))
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        position = array('q', offsets)
+        sources = array('q', bytes(8 * len(self.targets)))
+        for u in range(n):
+            for v in self.targets[self.offsets[u]:self.offsets[u + 1]]:
+                sources[position[v]] = u
+                position[v] += 1
+        return CsrGraph(offsets, sources)
+
+
+# Читает файл за один проход фрагментами: строки соседей разделяются по терминатору -2,
+# числа каждой строки разбираются одним вызовом, без цикла на Python по рёбрам
+def read_graph_csr(file_name, chunk_size=1 << 20):
+    offsets = array('q', [0])
+    targets = array('q')
+    with open(file_name, 'rb') as f:
+        n = int(f.readline())
+        rest = b''
+        while len(offsets) <= n:
+            chunk = f.read(chunk_size)
+            rows = (rest + chunk).split(b'-2')
+            # Последняя часть может оборваться посреди строки, она дополнится следующим фрагментом
+            rest = rows.pop() if chunk else b''
+            for row in rows[:n + 1 - len(offsets)]:
+                targets.extend(map(int, row.split()))
+                offsets.append(len(targets))
+            if not chunk:
+                break
+    # Строк в файле меньше n: у оставшихся вершин нет соседей
+    offsets.extend([len(targets)] * (n + 1 - len(offsets)))
+    return n, CsrGraph(offsets, targets)
+
+
+# Обход в глубину без рекурсии: глубокие графы не упираются в ограничение глубины рекурсии
 def dfs(graph, node, visited):
     visited[node] = True
-    for neighbor in graph[node]:
-        if not visited[neighbor]:
-            dfs(graph, neighbor, visited)
+    stack = [node]
+    while stack:
+        for neighbor in graph[stack.pop()]:
+            if not visited[neighbor]:
+                visited[neighbor] = True
+                stack.append(neighbor)
+
+
+# Вершины, достижимые из start, в обратном порядке выхода из обхода в глубину
+def reverse_postorder(graph, start):
+    visited = [False] * len(graph)
+    visited[start] = True
+    order = []
+    stack = [(start, iter(graph[start]))]
+    while stack:
+        node, neighbors = stack[-1]
+        for neighbor in neighbors:
+            if not visited[neighbor]:
+                visited[neighbor] = True
+                stack.append((neighbor, iter(graph[neighbor])))
+                break
+        else:
+            stack.pop()
+            order.append(node)
+    order.reverse()
+    return order
+
+
+# Непосредственные доминаторы по алгоритму Купера - Харви - Кеннеди. Вершины нумеруются в обратном
+# порядке выхода, тогда доминатор всегда имеет меньший номер, чем доминируемая вершина.
+# Для недостижимых из start вершин возвращается -1, для самой start - она сама.
+def immediate_dominators(graph, start=0):
+    order = reverse_postorder(graph, start)
+    number = [-1] * len(graph)
+    for i, node in enumerate(order):
+        number[node] = i
+    predecessors = [[] for _ in order]
+    for i, node in enumerate(order):
+        for neighbor in graph[node]:
+            predecessors[number[neighbor]].append(i)
+
+    idom = [-1] * len(order)
+    idom[0] = 0
+    changed = True
+    while changed:
+        changed = False
+        for b in range(1, len(order)):
+            new_idom = -1
+            for p in predecessors[b]:
+                if idom[p] == -1:
+                    continue
+                if new_idom == -1:
+                    new_idom = p
+                    continue
+                # Ближайший общий предок p и new_idom в текущем дереве доминаторов
+                while p != new_idom:
+                    while p > new_idom:
+                        p = idom[p]
+                    while new_idom > p:
+                        new_idom = idom[new_idom]
+            if idom[b] != new_idom:
+                idom[b] = new_idom
+                changed = True
+
+    result = [-1] * len(graph)
+    for i, node in enumerate(order):
+        result[node] = order[idom[i]]
+    return result
 
 
 def find_inevitable_points(n, graph):
-    visited_from_start = [False] * n
+    visited_from_start = bytearray(n)
     dfs(graph, 0, visited_from_start)
 
-    visited_from_finish = [False] * n
-    reverse_graph = [[] for _ in range(n)]
-    for u in range(n):
-        for v in graph[u]:
-            reverse_graph[v].append(u)
+    visited_from_finish = bytearray(n)
+    if isinstance(graph, CsrGraph):
+        reverse_graph = graph.reversed()
+    else:
+        reverse_graph = [[] for _ in range(n)]
+        for u in range(n):
+            for v in graph[u]:
+                reverse_graph[v].append(u)
 
     dfs(reverse_graph, n - 1, visited_from_finish)
 
@@ -38,33 +180,24 @@ def find_inevitable_points(n, graph):
     return inevitable_points
 
 
+# Точка разрыва лежит на всех путях от старта (0) до финиша (N-1), то есть доминирует над финишем:
+# это цепочка непосредственных доминаторов от финиша до старта
 def find_split_points(n, graph):
-    split_points = []
-
-    for s in range(1, n - 1):  # Проверяем все точки кроме стартовой (0) и финишной (N-1)
-        # Создаем граф без вершины s
-        subgraph = [[] for _ in range(n)]
+    idom = immediate_dominators(graph, 0)
+    if idom[n - 1] == -1:
+        # Финиш недостижим и без удаления вершин, поэтому разрывом считается любая точка
+        return list(range(1, n - 1))
 
-        for u in range(n):
-            if u == s:
-                continue
-            for v in graph[u]:
-                if v == s:
-                    continue
-                subgraph[u].append(v)
-
-        # Проверяем достижимость от старта до финиша
-        visited_from_start = [False] * n
-        dfs(subgraph, 0, visited_from_start)
-
-        if not visited_from_start[n - 1]:  # Если финиш недостижим
-            split_points.append(s)
-
-    return split_points
+    split_points = []
+    node = idom[n - 1]
+    while node != 0:
+        split_points.append(node)
+        node = idom[node]
+    return sorted(split_points)
 
 
 def main():
-    n, graph = read_graph('input.txt')
+    n, graph = read_graph_csr('input.txt')
 
     inevitable_points = find_inevitable_points(n, graph)
     split_points = find_split_points(n, graph)
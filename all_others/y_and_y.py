@@ -1,27 +1,500 @@
-'''
-Неправильно!
-'''
-
-n = int(input())
-days = [int(input()) for _ in range(n)]
-all_coupons = 0
-dc = {}
-count_big_nums = len(list(filter(lambda x: x > 100, days)))
-
-for i in range(count_big_nums + 1):
-    dc[i] = []
-removed = []
-
-for num in days:
-    dc[all_coupons].append(num)
-    if num > 100:
-        all_coupons += 1
-
-for key in dc:
-    if key and dc[key] != []:
-        removed += [key + len(list(a for b in list(dc.values())[:key] for a in b)) + dc[key].index(max(dc[key]))]
-        dc[key].remove(max(dc[key]))
-
-print(sum(a for b in dc.values() for a in b))
-print(0, all_coupons) if n == 0 or days[-1] < 101 else print(1, all_coupons - 1)
-[print(ind) for ind in removed]
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
+
+
+BIG_LUNCH = 100
+# Сколько первых разностей F(k) - F(k + 1) дешёвый день считает подряд, прежде чем искать пороги
+# двоичным поиском
+HEAD_SCAN = 16
+
+
+# Читает целые числа из двоичного потока фрагментами, не загружая весь вход в память
+def read_ints(file, chunk_size=1 << 20):
+    rest = b''
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        numbers = (rest + chunk).split()
+        # Последнее число может оборваться на границе фрагмента, оно дополнится следующим
+        rest = b'' if chunk[-1:].isspace() else numbers.pop()
+        yield from map(int, numbers)
+    if rest:
+        yield int(rest)
+
+
+# Список частей с их длинами, суммами и первыми элементами. Накопленные длины и суммы нужны для
+# поиска по номеру элемента; они считаются по запросу и сбрасываются (starts = None) при изменении
+class Parts:
+    def __init__(self, parts, counts, sums, mins):
+        self.parts = parts
+        self.counts = counts
+        self.sums = sums
+        self.mins = mins
+        self.starts = self.totals = None
+
+    # Номер части с элементом position и его номер внутри части; position, равный длине,
+    # приходится на конец последней части
+    def locate(self, position):
+        if self.starts is None:
+            self.starts = list(accumulate(self.counts, initial=0))
+            self.totals = list(accumulate(self.sums, initial=0))
+        j = bisect_right(self.starts, position, 0, len(self.parts)) - 1
+        return j, position - self.starts[j]
+
+
+# Кусок последовательности из листов array('q'). Листы никогда не меняются на месте, поэтому куски
+# можно делить между последовательностями: общий (shared) кусок перед изменением копируется,
+# и копируется при этом только список ссылок на листы
+class Chunk(Parts):
+    def __init__(self, leaves, counts, sums, mins):
+        super().__init__(leaves, counts, sums, mins)
+        self.shared = False
+
+    def copy(self):
+        return Chunk(self.parts[:], self.counts[:], self.sums[:], self.mins[:])
+
+    def __getitem__(self, index):
+        j, offset = self.locate(index)
+        return self.parts[j][offset]
+
+    def prefix_sum(self, count):
+        j, offset = self.locate(count)
+        leaf = self.parts[j]
+        if 2 * offset <= len(leaf):
+            return self.totals[j] + sum(leaf[:offset])
+        return self.totals[j + 1] - sum(leaf[offset:])
+
+    # Вставляет x и возвращает число элементов куска, меньших x
+    def insert(self, x, leaf_load):
+        self.starts = None
+        j = bisect_left(self.mins, x, 1) - 1
+        leaf = self.parts[j][:]
+        position = bisect_left(leaf, x)
+        leaf.insert(position, x)
+        rank = sum(self.counts[:j]) + position
+        if len(leaf) > 2 * leaf_load:
+            self.parts[j:j + 1] = leaf[:leaf_load], leaf[leaf_load:]
+            self.counts[j:j + 1] = leaf_load, len(leaf) - leaf_load
+            low = sum(self.parts[j])
+            self.sums[j:j + 1] = low, self.sums[j] + x - low
+            self.mins[j:j + 1] = leaf[0], leaf[leaf_load]
+        else:
+            self.parts[j] = leaf
+            self.counts[j] += 1
+            self.sums[j] += x
+            self.mins[j] = leaf[0]
+        return rank
+
+    def pop_min(self):
+        self.starts = None
+        leaf = self.parts[0]
+        x = leaf[0]
+        if len(leaf) > 1:
+            self.parts[0] = leaf[1:]
+            self.counts[0] -= 1
+            self.sums[0] -= x
+            self.mins[0] = leaf[1]
+        else:
+            del self.parts[0], self.counts[0], self.sums[0], self.mins[0]
+        return x
+
+    def add_to_min(self, delta):
+        self.starts = None
+        leaf = self.parts[0][:]
+        leaf[0] += delta
+        self.parts[0] = leaf
+        self.sums[0] += delta
+        self.mins[0] = leaf[0]
+
+    # Элементы с номерами из [start, stop), count - длина куска. Весь кусок возвращается сам
+    # и становится общим, иначе собирается новый из ссылок на листы и обрезков крайних листов
+    def take(self, start, stop, count):
+        if start == 0 and stop == count:
+            self.shared = True
+            return self
+        i, head = self.locate(start)
+        k, tail = self.locate(stop - 1)
+        tail += 1
+        leaves = self.parts[i:k + 1]
+        counts = self.counts[i:k + 1]
+        sums = self.sums[i:k + 1]
+        mins = self.mins[i:k + 1]
+        if tail < counts[-1]:
+            leaves[-1] = leaves[-1][:tail]
+            counts[-1] = tail
+            sums[-1] = sum(leaves[-1])
+        if head:
+            leaves[0] = leaves[0][head:]
+            counts[0] -= head
+            sums[0] = sum(leaves[0])
+            mins[0] = leaves[0][0]
+        return Chunk(leaves, counts, sums, mins)
+
+    # Склейка соседних кусков; стыковые листы объединяются, если вместе не длиннее 2 * leaf_load
+    @staticmethod
+    def join(left, right, leaf_load):
+        leaves = left.parts + right.parts
+        counts = left.counts + right.counts
+        sums = left.sums + right.sums
+        mins = left.mins + right.mins
+        j = len(left.parts)
+        if counts[j - 1] + counts[j] <= 2 * leaf_load:
+            leaves[j - 1:j + 1] = [leaves[j - 1] + leaves[j]]
+            counts[j - 1:j + 1] = [counts[j - 1] + counts[j]]
+            sums[j - 1:j + 1] = [sums[j - 1] + sums[j]]
+            del mins[j]
+        return Chunk(leaves, counts, sums, mins)
+
+
+# Отсортированная последовательность чисел в три уровня: список кусков, в куске до 2 * chunk_load
+# листов, в листе до 2 * leaf_load чисел. Вставка, удаление минимума, ранг, сумма первых элементов
+# и вырезание отрезка по номерам делают O(log n) шагов на Python и копируют O(leaf_load +
+# chunk_load + n / (leaf_load * chunk_load)) ссылок и чисел; отрезок не копируется поэлементно,
+# а делит целые куски с исходной последовательностью
+class SortedBlocks(Parts):
+    def __init__(self, leaf_load=64, chunk_load=64):
+        super().__init__([], [], [], [])
+        self.leaf_load = leaf_load
+        self.chunk_load = chunk_load
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        i, offset = self.locate(index)
+        return self.parts[i][offset]
+
+    # Сумма первых count элементов
+    def prefix_sum(self, count):
+        if not self.parts:
+            return 0
+        i, offset = self.locate(count)
+        return self.totals[i] + self.parts[i].prefix_sum(offset)
+
+    # Кусок, который можно менять на месте
+    def own(self, i):
+        chunk = self.parts[i]
+        if chunk.shared:
+            chunk = self.parts[i] = chunk.copy()
+        return chunk
+
+    # Вставляет x и возвращает число элементов, меньших x, до вставки
+    def insert(self, x):
+        if not self.parts:
+            self.append(x)
+            return 0
+        self.starts = None
+        self.size += 1
+        i = bisect_left(self.mins, x, 1) - 1
+        chunk = self.parts[i]
+        if chunk.shared:
+            chunk = self.own(i)
+        rank = sum(self.counts[:i]) + chunk.insert(x, self.leaf_load)
+        self.counts[i] += 1
+        self.sums[i] += x
+        self.mins[i] = chunk.mins[0]
+        half = self.chunk_load
+        if len(chunk.parts) > 2 * half:
+            left = Chunk(chunk.parts[:half], chunk.counts[:half], chunk.sums[:half], chunk.mins[:half])
+            right = Chunk(chunk.parts[half:], chunk.counts[half:], chunk.sums[half:], chunk.mins[half:])
+            self.parts[i:i + 1] = left, right
+            low = sum(left.counts)
+            self.counts[i:i + 1] = low, self.counts[i] - low
+            low = sum(left.sums)
+            self.sums[i:i + 1] = low, self.sums[i] - low
+            self.mins[i:i + 1] = left.mins[0], right.mins[0]
+        return rank
+
+    def pop_min(self):
+        self.starts = None
+        self.size -= 1
+        chunk = self.parts[0]
+        if chunk.shared:
+            chunk = self.own(0)
+        x = chunk.pop_min()
+        if chunk.parts:
+            self.counts[0] -= 1
+            self.sums[0] -= x
+            self.mins[0] = chunk.mins[0]
+        else:
+            del self.parts[0], self.counts[0], self.sums[0], self.mins[0]
+        return x
+
+    def add_to_min(self, delta):
+        self.starts = None
+        chunk = self.own(0)
+        chunk.add_to_min(delta)
+        self.sums[0] += delta
+        self.mins[0] = chunk.mins[0]
+
+    # Новая последовательность из элементов с номерами из [start, stop)
+    def take(self, start, stop):
+        part = SortedBlocks(self.leaf_load, self.chunk_load)
+        if start >= stop:
+            return part
+        i, head = self.locate(start)
+        k, tail = self.locate(stop - 1)
+        chunks = part.parts = self.parts[i:k + 1]
+        counts = part.counts = self.counts[i:k + 1]
+        sums = part.sums = self.sums[i:k + 1]
+        part.mins = self.mins[i:k + 1]
+        for chunk in chunks[1:-1]:
+            chunk.shared = True
+        if i < k:
+            chunks[-1] = chunks[-1].take(0, tail + 1, counts[-1])
+            counts[-1] = tail + 1
+            sums[-1] = sum(chunks[-1].sums)
+            tail = counts[0] - 1
+        chunks[0] = chunks[0].take(head, tail + 1, counts[0])
+        counts[0] = tail + 1 - head
+        sums[0] = sum(chunks[0].sums)
+        part.mins[0] = chunks[0].mins[0]
+        part.size = stop - start
+        return part
+
+    # Дописывает в конец элементы other, не меньшие своих; other после этого не используется
+    def extend(self, other):
+        if not other.parts:
+            return
+        self.starts = None
+        self.size += other.size
+        chunks, counts, sums, mins = other.parts, other.counts, other.sums, other.mins
+        if self.parts and len(self.parts[-1].parts) + len(chunks[0].parts) <= 2 * self.chunk_load:
+            self.parts[-1] = Chunk.join(self.parts[-1], chunks[0], self.leaf_load)
+            self.counts[-1] += counts[0]
+            self.sums[-1] += sums[0]
+            chunks, counts, sums, mins = chunks[1:], counts[1:], sums[1:], mins[1:]
+        self.parts += chunks
+        self.counts += counts
+        self.sums += sums
+        self.mins += mins
+
+    # Наименьший i из [low, high), при котором reached(i, сумма первых i элементов, i-й элемент)
+    # истинно, или high; reached не убывает по i, high <= len(self). Двоичный поиск спускается по
+    # кускам, листам и внутри листа, поэтому сумма и элемент для проверки берутся из готовых сумм
+    # и первых элементов частей, а считаются только внутри одного листа
+    def search(self, reached, low, high):
+        node, base, before = self, 0, 0
+        for _ in range(2):
+            if low >= high:
+                return high
+            node.locate(0)
+            starts, totals, mins = node.starts, node.totals, node.mins
+            # Проверяются начала частей внутри (low, high); ответ - в части перед первым успешным
+            left = bisect_right(starts, low - base)
+            right = bisect_left(starts, high - base, left, len(node.parts))
+            while left < right:
+                middle = (left + right) // 2
+                if reached(base + starts[middle], before + totals[middle], mins[middle]):
+                    right = middle
+                else:
+                    left = middle + 1
+            high = min(high, base + starts[left])
+            low = max(low, base + starts[left - 1])
+            base += starts[left - 1]
+            before += totals[left - 1]
+            node = node.parts[left - 1]
+        while low < high:
+            middle = (low + high) // 2
+            if reached(middle, before + sum(node[:middle - base]), node[middle - base]):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def first_leaf(self):
+        return self.parts[0].parts[0] if self.parts else array('q')
+
+    # Заменяет первые len(values) элементов, все из первого листа; порядок не должен нарушиться
+    def replace_head(self, values):
+        if not values:
+            return
+        self.starts = None
+        chunk = self.own(0)
+        chunk.starts = None
+        leaf = chunk.parts[0]
+        delta = sum(values) - sum(leaf[:len(values)])
+        chunk.parts[0] = array('q', values) + leaf[len(values):]
+        chunk.sums[0] += delta
+        self.sums[0] += delta
+        chunk.mins[0] = self.mins[0] = values[0]
+
+    # Дописывает в конец x, не меньший всех элементов
+    def append(self, x):
+        part = SortedBlocks(self.leaf_load, self.chunk_load)
+        part.parts = [Chunk([array('q', (x,))], [1], [x], [x])]
+        part.counts, part.sums, part.mins = [1], [x], [x]
+        part.size = 1
+        self.extend(part)
+
+
+# Точное решение. Каждый день - O(log n) шагов на Python; кроме них копируются и суммируются в C
+# списки листов куска (до 128) и список кусков (около n / 4096, сотни при миллионе дней). Ни один
+# день не перебирает купоны по одному. На случайных данных почти все дешёвые дни ничего не меняют.
+# Пусть F(k) - наибольшая выгода при k купонах на руках после очередного дня (лишние купоны можно
+# выбросить, поэтому F не возрастает). Бесплатный дешёвый обед тратит купон, бесплатный дорогой -
+# ещё и не приносит своего купона, то есть "весит" два купона; поэтому F вогнута только по чётным
+# и по нечётным k по отдельности, а простая жадность по куче не точна. Выгода бесплатного обеда -
+# его цена * M минус потерянные купоны: так при равной стоимости больше купонов остаётся.
+# Хранятся F(0) - F(1) и приращения F(k) - F(k + 2) для чётных (even) и нечётных (odd) k, каждые
+# по возрастанию. Дорогой день меняет чётность и сводится к вставке и удалению минимума.
+# Дешёвый день делает F(k) = max(F(k), F(k + 1) + выгода): до порога приращения берутся из другой
+# последовательности со сдвигом, после - остаются свои, так что новые последовательности
+# склеиваются из отрезков старых. Пороги ищутся двоичным поиском по суммам первых приращений.
+# Для восстановления ответа на каждый день запоминаются пороги: до какого числа купонов на руках
+# этот обед выгодно брать бесплатно.
+class CouponPlanner:
+    def __init__(self, days_count):
+        self.scale = 2 * days_count + 1
+        self.coupons = 0
+        self.first = 0
+        self.even = SortedBlocks()
+        self.odd = SortedBlocks()
+
+    # Возвращает 2 * (число k >= 1, при которых обед бесплатный) + (бесплатный ли он при k = 0)
+    def big_day(self, cost):
+        value = cost * self.scale - 2
+        if self.coupons == 0:
+            self.coupons = 1
+            return 0
+        free_at_zero = 1 if self.first < value else 0
+        if len(self.even):
+            first = value - max(self.first, value - (self.even.mins[0] - self.first))
+        else:
+            first = value - self.first
+        threshold = self.odd.insert(value) + self.even.insert(value)
+        self.even.pop_min()
+        self.even, self.odd = self.odd, self.even
+        if first < 0:
+            # F(0) < F(1): лишний купон выбрасывается, F(0) поднимается до F(1)
+            if len(self.even):
+                self.even.add_to_min(-first)
+            first = 0
+        self.first = first
+        self.coupons += 1
+        return 2 * threshold + free_at_zero
+
+    # Возвращает пороги для чётного и нечётного числа купонов на руках
+    def small_day(self, cost):
+        value = cost * self.scale - 1
+        # Чаще всего обед не стоит купона ни при каком их числе на руках, и ничего не меняется
+        if self.coupons == 0 or self.first >= value and (
+                self.coupons == 1 or self.even.mins[0] - self.first >= value):
+            return 0, 0
+
+        # Обычно оба порога близко к началу: разности d(p) = F(p) - F(p + 1) считаются подряд
+        # по первым листам, и если пороги нашлись, меняются только эти листы
+        even_leaf, odd_leaf = self.even.first_leaf(), self.odd.first_leaf()
+        diffs = [self.first]
+        even_limit = 0 if self.first >= value else None
+        odd_limit = None
+        for p in range(1, min(2 * len(even_leaf), 2 * len(odd_leaf) + 2, HEAD_SCAN)):
+            diff = (even_leaf if p % 2 else odd_leaf)[(p - 1) // 2] - diffs[-1]
+            diffs.append(diff)
+            if diff >= value:
+                if p % 2 == 0:
+                    if even_limit is None:
+                        even_limit = p // 2
+                elif odd_limit is None:
+                    odd_limit = p // 2
+                if even_limit is not None and odd_limit is not None:
+                    break
+        else:
+            return self.splice(value, even_limit, odd_limit, len(diffs))
+
+        # До порога F(k) = F(k + 1) + value, поэтому начало чётных приращений - нечётные со сдвигом
+        # и наоборот, а на пороге - одно новое приращение
+        even_head = odd_leaf[:even_limit - 1].tolist() + [diffs[2 * even_limit - 1] + value] if even_limit else []
+        odd_head = even_leaf[1:odd_limit].tolist() + [diffs[2 * odd_limit] + value] if odd_limit else []
+        self.even.replace_head(even_head)
+        self.odd.replace_head(odd_head)
+        self.first = (value if even_limit else self.first) - (value - diffs[1] if odd_limit else 0)
+        return even_limit, odd_limit
+
+    # То же, когда хотя бы один порог дальше первых scanned разностей: он ищется двоичным поиском
+    # по суммам первых приращений, а новые последовательности склеиваются из отрезков старых
+    def splice(self, value, even_limit, odd_limit, scanned):
+        even, odd, first = self.even, self.odd, self.first
+
+        # F(2i) - F(2i + 1); F(2i + 1) - F(2i + 2) = even[i] - even_diff(i). Обе разности
+        # не убывают по i, поэтому пороги - первые i, где они достигают value
+        def even_diff(i):
+            return first + odd.prefix_sum(i) - even.prefix_sum(i)
+
+        if even_limit is None:
+            limit = (self.coupons + 1) // 2
+            even_limit = even.search(lambda i, before, x: first + odd.prefix_sum(i) - before >= value,
+                                     (scanned + 1) // 2, min(limit, len(even)))
+            if even_limit == len(even) < limit and even_diff(even_limit) < value:
+                even_limit += 1
+        if odd_limit is None:
+            odd_limit = even.search(lambda i, before, x: x - first - odd.prefix_sum(i) + before >= value,
+                                    scanned // 2, self.coupons // 2)
+
+        if even_limit:
+            new_even = odd.take(0, even_limit - 1)
+            if even_limit <= len(even):
+                new_even.append(even[even_limit - 1] - even_diff(even_limit - 1) + value)
+                new_even.extend(even.take(even_limit, len(even)))
+            self.even = new_even
+        if odd_limit:
+            new_odd = even.take(1, odd_limit)
+            if odd_limit <= len(odd):
+                new_odd.append(even_diff(odd_limit) + value)
+                new_odd.extend(odd.take(odd_limit, len(odd)))
+            self.odd = new_odd
+        self.first = (value if even_limit else first) - (value - (even.mins[0] - first) if odd_limit else 0)
+        return even_limit, odd_limit
+
+
+# Номера (с нуля, по возрастанию) дней, в которые обед берётся по купону
+def plan_coupons(costs):
+    planner = CouponPlanner(len(costs))
+    first_limits = array('i', bytes(4 * len(costs)))
+    second_limits = array('i', bytes(4 * len(costs)))
+    for day, cost in enumerate(costs):
+        if cost > BIG_LUNCH:
+            first_limits[day] = planner.big_day(cost)
+        else:
+            first_limits[day], second_limits[day] = planner.small_day(cost)
+
+    # Обратный проход: coupons - сколько купонов должно быть на руках после дня
+    free_days = []
+    coupons = 0
+    for day in range(len(costs) - 1, -1, -1):
+        if costs[day] > BIG_LUNCH:
+            limit = first_limits[day]
+            if (limit & 1) if coupons == 0 else coupons - 1 < limit >> 1:
+                free_days.append(day)
+                coupons += 1
+            elif coupons:
+                coupons -= 1
+        elif coupons // 2 < (second_limits[day] if coupons % 2 else first_limits[day]):
+            free_days.append(day)
+            coupons += 1
+    free_days.reverse()
+    return free_days
+
+
+def main():
+    numbers = read_ints(sys.stdin.buffer)
+    n = next(numbers, 0)
+    costs = array('q', islice(numbers, n))
+
+    free_days = plan_coupons(costs)
+    free_costs = sum(costs[day] for day in free_days)
+    free_big = sum(1 for day in free_days if costs[day] > BIG_LUNCH)
+    all_coupons = sum(1 for cost in costs if cost > BIG_LUNCH) - free_big
+
+    out = sys.stdout
+    out.write(f"{sum(costs) - free_costs}\n{all_coupons - len(free_days)} {len(free_days)}\n")
+    for start in range(0, len(free_days), 1 << 16):
+        out.write(''.join(f"{day + 1}\n" for day in free_days[start:start + (1 << 16)]))
+
+
+if __name__ == "__main__":
+    main()